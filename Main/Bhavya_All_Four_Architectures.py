@@ -1,11 +1,22 @@
 import dspy
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict, fields
 from typing import List, Optional
 import os
 from dotenv import load_dotenv
 import pandas as pd
 import argparse
 import json
+import re
+import hashlib
+import time
+import math
+import glob
+import uuid
+import threading
+import queue
+import heapq
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 load_dotenv(os.path.join(SCRIPT_DIR, '.env'))
@@ -34,6 +45,34 @@ Group the top-ranked fragments into thematic arguments based on your role:
 Output: Return only the final clustered arguments with their taglines.
 """
 
+FRAGMENT_PROMPT = """You are a divergent debate engine designed to build a constructive case.
+
+Motion: "{motion}"
+Side: {side}
+Role: {role}
+
+Generate 20 distinct argument fragments for your side. Each fragment must have:
+  - Premise: The starting condition.
+  - Mechanism: The specific causal chain (How A leads to B).
+  - Impact: The final outcome.
+  - Strength: 1-10, its logical strength and strategic value.
+  - Constraint: The MECHANISM must be unique for every fragment. You may have similar impacts, but the logical path to get there must be different.
+
+Output: Return only JSON, no prose:
+[{{"premise": "...", "mechanism": "...", "impact": "...", "strength": 7}}]
+"""
+
+CLUSTER_PROMPT = """You are a debate strategist building a constructive case. Below are argument fragments for your side, strongest first. Fragments whose mechanism your teammate already explained have been removed.
+
+Role: {role}
+
+Group the top-ranked fragments into thematic arguments based on your role:
+  - If 1st Speaker (Prop 1 / Opp 1): Take the top 6-10 fragments and cluster them into 2 distinct Contentions.
+  - If 2nd Speaker (Prop 2 / Opp 2): Take the top 3-5 fragments and cluster them into 1 single Extension Argument.
+
+Output: Return only the final clustered arguments with their taglines.
+"""
+
 PARSER_PROMPT = """You are a semantic classifier for debate motions.
 Your goal is to map the motion to a high-level domain to determine which logic schemas to load.
 
@@ -63,6 +102,23 @@ Output:
 [A single paragraph argument based on the template]
 """
 
+BATCH_SLOT_FILLER_PROMPT = """You are a logic engine. Your goal is to apply several abstract argument templates to a specific motion.
+
+Motion: "{motion}"
+
+Templates:
+{templates}
+
+Task:
+For EACH template, rewrite the Logic Template to apply specifically to this motion.
+Replace abstract placeholders (like {{X}}, {{actor}}, {{policy}}) with specific terms from the motion.
+Ensure the logic flows perfectly. Each argument is a single paragraph.
+
+Output:
+A JSON object mapping every Schema Name exactly as given to its argument paragraph, and nothing else:
+{{"<Schema Name>": "<argument paragraph>", ...}}
+"""
+
 EXTRACT_PROMPT = """You are an expert debate adjudicator and strategist. Your goal is to map the opponent's case into a structured hierarchy of threats.
 
 Step 1: Atomic Extraction
@@ -88,6 +144,34 @@ Return a structured object:
   - Bucket 2 (Theme Name): ...
 """
 
+SPEECH_EXTRACT_PROMPT = """You are an expert debate adjudicator and strategist. Your goal is to list the threats in ONE opponent speech.
+
+Step 1: Atomic Extraction
+Extract distinct 'Strategic Ideas' from the speech. A Strategic Idea must be one of:
+  - Mechanism Flaw: Why their action fails, won't happen, or won't lead to the result.
+  - Impact Claim: Why their outcome matters (or explaining why it doesn't).
+  - Characterization: How they define the world or the status quo.
+    Constraint: Extract ONLY from the speech provided.
+
+Step 2: Damage Scoring
+Score every idea from 1 to 10 for 'Damage Potential' - how likely it is to lose us the debate if left unanswered.
+
+Output Format (one idea per line, nothing else):
+  - [Mechanism Flaw|Impact Claim|Characterization] Description of the idea (Damage: 8)
+"""
+
+BUCKET_PROMPT = """You are an expert debate strategist. Below is the ranked list of 'Strategic Ideas' the opponents have made so far, highest damage first.
+
+Task: Group the top-ranked ideas into {NUM_BUCKETS} thematic buckets. Keep the ranking inside each bucket.
+
+Output Format:
+Return a structured object:
+  - Bucket 1 (Theme Name):
+      - Idea 1: [Description of Mechanism/Impact] (Rank: High)
+      - Idea 2: [Description] (Rank: Medium)
+  - Bucket 2 (Theme Name): ...
+"""
+
 REFUTE_PROMPT = """You are a ruthless debate strategist. Your goal is to destroy the opponent's case by attacking their specific ideas.
 
 Input: A list of thematic buckets, where each bucket contains a list of specific 'Strategic Ideas'.
@@ -107,6 +191,29 @@ Output: A mapping:
   - Bucket -> Idea -> [Response 1, Response 2...]
 """
 
+FUSED_REBUTTAL_PROMPT = """You are an expert debate adjudicator and a ruthless debate strategist. Your goal is to map the opponent's case into threats and destroy each one, in a single pass.
+Role: You are the {SPEAKER_ROLE}.
+
+Step 1: Atomic Extraction
+Extract distinct 'Strategic Ideas' from the opponent's speech(es) only. A Strategic Idea is a Mechanism Flaw, an Impact Claim or a Characterization.
+
+Step 2: Strategic Ranking and Clustering
+Rank the ideas by 'Damage Potential' and group the top-ranked ones into {NUM_BUCKETS} thematic buckets.
+
+Step 3: Refutation
+For every Idea in every Bucket, write {NUM_RESPONSES} distinct responses using these tactics:
+1. Worldview Challenge: 'They assume X, but the world is actually Y.'
+2. The Turn (Flip): the mechanism causes the opposite effect or the impact actually helps YOUR side.
+3. Destruction: Direct denial of facts or mitigation of impact.
+
+Output: A mapping, and nothing else:
+  - Bucket 1 (Theme Name):
+      - Idea 1: [Description] (Rank: High)
+          - Response 1: ...
+          - Response 2: ...
+  - Bucket 2 (Theme Name): ...
+"""
+
 SYNTH_PROMPT = """You are the final speaker delivering a verbal debate speech. You have been given a set of 'Ingredients':
 1. Refutations: A map of responses to the enemy's points (if applicable).
 2. Constructives: New arguments/extensions to present (if applicable).
@@ -121,6 +228,54 @@ Instructions:
 3. Tone: Confident, engaging, and spoken-word style.
 """
 
+# appended to a stage prompt in compact ir mode; the parsed result is re-serialized tightly for the next stage
+IR_FORMATS = {
+    "threats": """OUTPUT FORMAT OVERRIDE: ignore the output format above. Return only JSON, no prose:
+{"buckets": [{"theme": "<2-6 words>", "ideas": [{"claim": "<one sentence, max 25 words>", "type": "mechanism|impact|characterization", "rank": "H|M|L"}]}]}""",
+    "refutations": """OUTPUT FORMAT OVERRIDE: ignore the output format above. Return only JSON, no prose:
+{"refutations": [{"idea": "<idea id if one is given, e.g. B1.2>", "claim": "<the idea, max 12 words>", "theme": "<its bucket theme>", "responses": ["<one or two sentences>"]}]}""",
+    "case": """OUTPUT FORMAT OVERRIDE: ignore the output format above. Return only JSON, no prose:
+{"arguments": [{"tagline": "<max 12 words>", "fragments": [{"mechanism": "<one sentence>", "impact": "<one sentence>"}]}]}"""
+}
+
+OUTLINE_PROMPT = """You are planning a verbal debate speech before it is written. You have been given its 'Ingredients'.
+Role: {role}
+
+Plan exactly these sections, in this order: {sections}
+For each section give a short title, the 2-4 points it must make (drawn from the ingredients) and a signpost sentence that opens it and links it to the previous section.
+
+Output: Return only JSON, no prose:
+{{"sections": [{{"title": "...", "points": ["..."], "signpost": "..."}}]}}
+"""
+
+SECTION_PROMPT = """You are the {role} delivering ONE section of a verbal debate speech. The other sections are being written at the same time from the same outline, so write only yours.
+
+Speech outline:
+{outline}
+
+Your section: {section} (about {words} words)
+
+Rules:
+  - Open with your section's signpost sentence so the speech flows on from the previous section.
+  - Make only your section's points. Do not introduce the whole speech or conclude it unless your section is the Introduction or the Conclusion.
+  - No headings, no greetings. Tone: Confident, engaging, and spoken-word style.
+"""
+
+SPEECH_DIGEST_PROMPT = """You are a debate note-taker. Compress the speech below into a digest a later speaker can respond to.
+
+Rules:
+  - List every distinct argument as one line: Claim -> Mechanism -> Impact.
+  - List every rebuttal the speaker made as one line: Target -> Response.
+  - Keep concrete examples and numbers only if an argument depends on them.
+  - No commentary, no evaluation, at most 200 words.
+
+Output Format:
+Arguments:
+  - ...
+Rebuttals:
+  - ...
+"""
+
 try:
     with open(os.path.join(SCRIPT_DIR, 'logic_store.json'), 'r') as f:
         LOGIC_STORE = json.load(f)
@@ -208,6 +363,148 @@ Structure your speech as follows:
 4. Conclusion (approx. 100 words): Explain why, overall, Opposition has proven the superior case."""
 }
 
+# wudc-style judging prompt
+JUDGE_PROMPT = """You are an Expert Debate Adjudicator
+
+You are tasked with judging a 3v3 debate between Proposition and Opposition teams. You must adopt the persona of the Ordinary Intelligent Voter (OIV) as defined by the WUDC Debating Manual.
+
+Your Persona and Disposition
+- Knowledge Base: You are a smart, generalist reader. You know basic geopolitical and social facts (e.g., you know Syria is in the Middle East), but you do not possess specialist or technical knowledge (e.g., you do not know specific legal precedents or complex economic formulas).
+- Open-Mindedness: You have no preformed views on the topic. You are cynical about mere assertions and require reasoned analysis to be persuaded.
+- Neutrality: You must not judge based on your personal preferences or political alignment. You judge solely on the persuasiveness of the arguments presented within the text.
+
+Your Evaluation Process
+You must evaluate the debate based on four weighted axes.
+
+1. Argumentation and Analysis (45%)
+- Logic over Assertion: Do not credit bare assertions. Credit arguments that provide mechanistic links - reasons why X leads to Y.
+- Impact: Credit teams that explain why an outcome matters (morally, practically, or emotionally).
+- Consistency: Check for contradictions. If a later speaker contradicts an earlier partner, ignore the later claim and stick to the team's original stance.
+- Plausibility: Reject claims that are factually absurd or logical leaps that an ordinary person would find impossible to believe.
+
+2. Engagement and Rebuttal (35%)
+- Direct Responsiveness: You must track which arguments were answered. If a team ignores a core argument from their opponents, you must treat that argument as conceded and true.
+- The Silence Rule: If Proposition proves X is true and Opposition never mentions X, then X is a fact in this debate. You must weigh this fact in your final decision.
+- Comparative Weighing: Give higher credit to teams that explicitly compare their impacts against their opponents' (e.g., Our impact affects fewer people but is a breach of a more important human right).
+
+3. Role Fulfillment (10%)
+- 1st Proposition: Must define the motion. If the definition is a squirrel (unfairly restrictive or logically impossible), penalize them heavily.
+- 1st Opposition: Must oppose the motion. They may defend the status quo or propose a counter-model.
+
+4. Clarity of Expression (10%)
+- Precision: Evaluate whether the meaning of the text is unambiguous.
+- Comprehensibility: The text must be clear enough for an average reader to follow the logic.
+- Note on Jargon: While you should not penalize the use of technical terms heavily, if a term renders an argument confusing to a layperson, treat the argument as less persuasive.
+
+Scoring Guide (Strict Adherence Required)
+
+You must assign a score between 50 and 100 to each speech. Be extremely strict. Do not succumb to grade inflation.
+
+- 90-100 (Legendary/Rare): Do not award this lightly. This score is reserved for the best speeches in human history. The argument is flawless, the rebuttal is devastating, and it is nearly impossible to imagine a better speech.
+- 85-89 (Exceptional): A very high bar. The speech addresses the core issues with sophisticated analysis and has almost no flaws.
+- 80-84 (Very Good): A high-quality speech. It is relevant, deeply analytical, and well-structured, but may have minor vulnerabilities.
+- 75-79 (Good/Competent): Relevant and logical, but may rely on some simplifications or miss minor nuances.
+- 70-74 (Beginner/Average): The speech is relevant but has significant logical gaps or relies on assertions rather than proof.
+- 60-69 (Below Average/Poor): Hard to follow, barely relevant, or logically confused.
+- 50-59 (Non-Functional): Irrelevant content or gibberish.
+
+Step-by-Step Decision Protocol
+
+1. Identify Claims: List the core arguments made by Proposition and Opposition.
+2. Filter Invalid Arguments:
+- Delete arguments based on knifing (contradicting partners).
+- Delete assertions that lack logical backing.
+3. Determine Truth:
+- Did the Opponent rebut Claim A?
+- If YES: Evaluate who had better analysis.
+- If NO: Claim A is true.
+4. Weigh Impacts: Compare the surviving impacts. Use the metrics provided by the teams. If no metrics were provided, use your common sense as an Ordinary Intelligent Voter.
+5. Score Each Speaker: Assign a score between 50-100 to each speaker based on the criteria above.
+6. Calculate Total Scores: Sum all speaker scores for each team.
+7. Declare Winner: THE TEAM WITH THE HIGHER TOTAL SCORE WINS. This is a mathematical determination based on the scores you assigned. If Proposition's total score is higher, Proposition wins. If Opposition's total score is higher, Opposition wins. You must follow this rule strictly.
+
+--- DEBATE TRANSCRIPT ---
+{transcript}
+--- END TRANSCRIPT ---
+
+Provide your evaluation in this EXACT format:
+
+PROPOSITION SPEAKER 1 SCORE: [score]
+OPPOSITION SPEAKER 1 SCORE: [score]
+PROPOSITION SPEAKER 2 SCORE: [score]
+OPPOSITION SPEAKER 2 SCORE: [score]
+PROPOSITION SPEAKER 3 SCORE: [score]
+OPPOSITION SPEAKER 3 SCORE: [score]
+WINNER: [Proposition/Opposition]
+REASON: [Your detailed RFD explaining why this team won]
+"""
+
+# persona, axes and scoring guide of JUDGE_PROMPT, shared by the incremental judge prompts
+JUDGE_RUBRIC = JUDGE_PROMPT.split("Step-by-Step Decision Protocol")[0].strip()
+
+SPEECH_JUDGE_PROMPT = JUDGE_RUBRIC + """
+
+You are judging this debate live, one speech at a time, and will not see earlier speeches again. The LEDGER is your own compact record of the debate so far.
+
+Motion: {motion}
+
+--- LEDGER SO FAR ---
+{ledger}
+--- END LEDGER ---
+
+--- NEW SPEECH: {team} Speaker {speaker_number} ---
+{speech}
+--- END SPEECH ---
+
+1. Score this speech between 50 and 100 on the criteria above. Judge its engagement against the claims in the ledger: which of them it answered, and which it ignored.
+2. Rewrite the ledger to include this speech. One line per live claim: who made it, the claim in under 20 words, and its status (standing / rebutted by [Team Speaker N] / conceded / knifed). Merge repeated claims and drop claims that no longer matter. Keep the ledger under 250 words.
+
+Provide your evaluation in this EXACT format:
+
+SCORE: [score]
+NOTE: [One or two sentences on this speech's strengths and weaknesses]
+LEDGER:
+- [Team Speaker N] [claim] - [status]
+"""
+
+AGGREGATE_JUDGE_PROMPT = JUDGE_RUBRIC + """
+
+You judged this debate live, one speech at a time. Below are your final ledger of the claims and the provisional score and note you gave each speech as it was delivered.
+
+Apply the decision protocol to the ledger: claims that were never answered are conceded and true, rebutted claims go to whoever had the better analysis, and the surviving impacts are weighed. You may move a provisional score by up to 3 points where later speeches changed how a speech should be judged (e.g. a claim it rebutted was later rebuilt). THE TEAM WITH THE HIGHER TOTAL SCORE WINS.
+
+Motion: {motion}
+
+--- FINAL LEDGER ---
+{ledger}
+--- END LEDGER ---
+
+--- PROVISIONAL SCORES ---
+{scores}
+--- END SCORES ---
+
+Provide your evaluation in this EXACT format:
+
+{score_lines}
+WINNER: [Proposition/Opposition]
+REASON: [Your RFD explaining why this team won]
+"""
+
+JUDGE_JSON_FORMAT = """OUTPUT FORMAT OVERRIDE: ignore the output format above. Return only JSON, no prose:
+{"prop_scores": [<Proposition Speaker 1 score>, <Proposition Speaker 2 score>, ...], "opp_scores": [<Opposition Speaker 1 score>, ...], "winner": "Proposition|Opposition", "reason": "<your RFD explaining why this team won>"}"""
+
+JUDGE_REPAIR_PROMPT = """You are an Expert Debate Adjudicator. Below is the verdict you wrote for a debate. Some of its speaker scores are missing, unreadable or outside the 50-100 range.
+
+--- YOUR VERDICT ---
+{response}
+--- END VERDICT ---
+
+Re-read your verdict and give only the scores below, between 50 and 100, consistent with the reasoning you already wrote. Do not re-judge the debate or repeat anything else.
+
+Provide only these lines, in this EXACT format:
+{field_lines}
+"""
+
 @dataclass
 class Turn:
     speaker_position: str
@@ -229,10 +526,499 @@ class DebateResult:
     opp_scores: List[int]
     winner: str
     reason_for_decision: str
+    usage: dict = field(default_factory=dict)
+    options: dict = field(default_factory=dict)
+    judge_details: dict = field(default_factory=dict)
+
+@dataclass
+class PipelineOptions:
+    # "full" pastes every prior speech verbatim; "digest" sends digests for all but the most recent ones
+    context_mode: str = "full"
+    keep_recent: int = 1
+    # pipeline stage -> short model name; stages not listed run on the team's model
+    stage_models: dict = field(default_factory=dict)
+    # start opponent-independent constructive stages (ARG_GEN, slot filling) as early as their inputs allow
+    speculative: bool = True
+    # "full" re-extracts every opponent speech in one call; "incremental" extracts each speech once, then buckets
+    extraction_mode: str = "full"
+    # "single" refutes every bucket in one call; "per_bucket" sends each bucket to its own concurrent call
+    refute_mode: str = "single"
+    # schema_guided: "per_schema" fills each schema in its own call; "batched" fills all of them in one json call
+    slot_fill_mode: str = "per_schema"
+    # "separate" runs extraction then refutation; "fused" does both in one call (extraction/refute modes then unused)
+    rebuttal_mode: str = "separate"
+    # "prose" passes stage outputs on as written; "compact" asks for json and passes on a tight serialization
+    ir_mode: str = "prose"
+    # drop refutation responses/ideas whose word bigrams overlap an earlier one by at least this (jaccard); 0 = off
+    response_dedup: float = 0.0
+    # enhanced: "single" runs ARG_GEN_PROMPT in one call; "split" brainstorms json fragments, filters out the
+    # teammate's mechanisms locally and sends only the survivors to a short clustering call
+    generation_mode: str = "single"
+    # split mode: share of a fragment's mechanism bigrams found in one teammate sentence that marks it as used
+    mechanism_overlap: float = 0.5
+    # enhanced (implies split generation): 2nd speakers draw their extension from the fragments their first
+    # speaker brainstormed but did not use, brainstorming afresh only when too few are left
+    fragment_pool: bool = False
+    # enhanced/schema_guided: "single" writes the speech in one SYNTH_PROMPT call; "sections" plans an outline,
+    # writes the sections concurrently and stitches them
+    synthesis_mode: str = "single"
+    # stage or "stage:position" -> expected output tokens; when set, each call gets max_tokens = expected * cap_margin
+    output_budgets: dict = field(default_factory=dict)
+    cap_margin: float = 1.5
+    # text file that replaces SYNTH_PROMPT, for synthesis prompt ablations
+    synth_prompt_file: str = ""
+    # short judge model names run concurrently as a panel (repeats are re-sampled); empty = the single -jm judge
+    judge_panel: list = field(default_factory=list)
+    # "transcript" judges the whole debate at the end; "incremental" scores each speech against a running ledger
+    # as soon as it exists, then makes one short aggregation call (panel and cascade apply to transcript mode)
+    judge_mode: str = "transcript"
+    # missing or out-of-range scores get a short repair call, then (if still bad) one full re-judge
+    judge_repair: bool = True
+    # "text" keeps JUDGE_PROMPT's score lines; "json" asks for a json verdict (the parser reads either)
+    judge_format: str = "text"
+    # short model name of a cheap first judge; its verdict stands when prop and opp totals differ by more than
+    # cascade_margin, otherwise the debate goes to the -jm judge (or panel)
+    judge_cascade: str = ""
+    cascade_margin: float = 5.0
+    # share of decisive cheap verdicts also sent to the strong judge, to measure agreement above the margin
+    cascade_audit: float = 0.0
+
+def options_from_job(job):
+    return PipelineOptions(**{f.name: job[f.name] for f in fields(PipelineOptions) if job.get(f.name) is not None})
+
+# usd per 1m tokens (input, output), openai list prices
+MODEL_PRICES = {
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+    'o1': (15.00, 60.00),
+    'o1-mini': (1.10, 4.40),
+    'o3': (2.00, 8.00)
+}
+
+# rough output speed (tokens/sec) and fixed overhead per call (sec), overridden by call log history
+MODEL_SPEED = {
+    'gpt-4o': (80, 1.0),
+    'gpt-4o-mini': (90, 0.8),
+    'o1': (60, 10.0),
+    'o1-mini': (90, 5.0),
+    'o3': (60, 10.0)
+}
+
+# reasoning models bill hidden reasoning tokens as output, roughly this many per visible token
+REASONING_MODELS = {'o1': 3.0, 'o1-mini': 3.0, 'o3': 3.0}
+
+# typical output size (tokens) per stage, used until a call log gives real averages
+DEFAULT_STAGE_OUTPUT_TOKENS = {
+    "speech": 1700,
+    "extract": 700,
+    "refute": 1800,
+    "parse": 60,
+    "slot_fill": 250,
+    "generate": 1400,
+    "synthesize": 1700,
+    "judge": 1200,
+    "digest": 300,
+    "bucket": 600,
+    "rebut": 2200,
+    "cluster": 700,
+    "outline": 350,
+    "section": 450,
+    "judge_speech": 450,
+    "judge_repair": 60
+}
+
+# english prose, used to turn the prompts' word targets into output token budgets
+TOKENS_PER_WORD = 1.35
+
+# with --prefix-samples K > 1 only the stages that write speech text are sampled, at one temperature for all K
+# variants; extraction, refutation, parsing and cases stay deterministic so the variants differ only in delivery
+SAMPLED_STAGES = {"speech", "synthesize", "section"}
+SAMPLE_TEMPERATURE = 1.0
+
+def speech_target_words(position):
+    # the longest speech any architecture's prompt asks this speaker for
+    words = [int(n) for prompts in (BASELINE_PROMPTS, DETAILED_PROMPTS)
+             for match in re.findall(r"approximately (\d+)(?: to (\d+))? words", prompts.get(position, ""))
+             for n in match if n]
+    return max(words, default=1200)
+
+def build_output_budgets(history=None):
+    # speeches: the word targets in the prompts; intermediate stages: p95 of recorded outputs, else the defaults
+    budgets = dict(DEFAULT_STAGE_OUTPUT_TOKENS)
+    budgets.update((history or {}).get("stage_output_p95", {}))
+    budgets.pop("judge", None)
+    for position in BASELINE_PROMPTS:
+        target = int(speech_target_words(position) * TOKENS_PER_WORD)
+        budgets[f"speech:{position}"] = target
+        budgets[f"synthesize:{position}"] = target
+    return budgets
+
+# context windows (tokens) used by the pre-flight check
+MODEL_CONTEXT_LIMITS = {
+    'gpt-4o': 128000,
+    'gpt-4o-mini': 128000,
+    'o1': 200000,
+    'o1-mini': 128000,
+    'o3': 200000
+}
+
+def estimate_tokens(text):
+    # ~4 characters per token for english prose, close enough for budgeting
+    return math.ceil(len(text) / 4) if text else 0
+
+def model_id(lm):
+    # dspy.LM keeps the litellm name, e.g. openai/gpt-4o
+    name = getattr(lm, "model", str(lm))
+    return name.split("/")[-1]
+
+def estimate_cost(model, input_tokens, output_tokens):
+    in_price, out_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    billed_output = output_tokens * (1 + REASONING_MODELS.get(model, 0.0))
+    return (input_tokens * in_price + billed_output * out_price) / 1_000_000
+
+class BudgetExceeded(Exception):
+    pass
+
+class TokenBudget:
+    # spending ceiling in usd, shared by every call charged against it (one debate or a whole study)
+    def __init__(self, max_cost_usd, name="budget"):
+        self.max_cost_usd = max_cost_usd
+        self.name = name
+        self.spent = 0.0
+        self.lock = threading.Lock()
+
+    def remaining(self):
+        with self.lock:
+            return self.max_cost_usd - self.spent
+
+    def exhausted(self):
+        return self.remaining() <= 0
+
+    def charge(self, cost):
+        with self.lock:
+            self.spent += cost
+
+def output_is_truncated(output_tokens, max_tokens):
+    # token counts are estimates, so an output within 10% of its cap is taken to have hit it
+    return output_tokens >= 0.9 * max_tokens
+
+def truncate_text(text, max_tokens):
+    # keep the head and the tail: instructions sit at one end or the other in every prompt
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    marker = "\n[... truncated to fit token budget ...]\n"
+    head = max(0, max_chars // 3 - len(marker))
+    tail = max_chars - head - len(marker)
+    return text[:head] + marker + text[-tail:]
+
+def compress_text(text, max_tokens):
+    # local extractive compression: long paragraphs keep only their first and last sentence
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    paragraphs = []
+    for paragraph in text.split("\n"):
+        sentences = re.split(r'(?<=[.!?])\s+', paragraph)
+        if len(sentences) > 2:
+            paragraph = f"{sentences[0].strip()} ... {sentences[-1].strip()}"
+        paragraphs.append(paragraph)
+    return truncate_text("\n".join(paragraphs), max_tokens)
+
+_CALL_LOG_LOCK = threading.Lock()
+
+class UsageTracker:
+    # collects one record per llm call in a debate, optionally appending them to a jsonl call log
+    def __init__(self, debate_id=None, log_path=None, budgets=None, policy="truncate"):
+        self.debate_id = debate_id or uuid.uuid4().hex[:8]
+        self.log_path = log_path
+        self.budgets = [b for b in (budgets or []) if b]
+        self.policy = policy
+        self.budget_actions = []
+        self.savings = {}
+        self.hits = {}
+        self.fallbacks = {}
+        self.counts = {}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def note_saving(self, kind, tokens):
+        with self.lock:
+            self.savings[kind] = self.savings.get(kind, 0) + tokens
+
+    def note_hit(self, kind, tokens):
+        # a call that was answered from a store instead of the model
+        with self.lock:
+            self.hits[kind] = self.hits.get(kind, 0) + 1
+        self.note_saving(kind, tokens)
+
+    def note_fallback(self, kind, count=1):
+        # a cheaper structured path that did not parse and was redone the old way
+        with self.lock:
+            self.fallbacks[kind] = self.fallbacks.get(kind, 0) + count
+
+    def note_count(self, name):
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def preflight(self, stage, position, lm, prompt):
+        # estimate the call before it is queued; fit it to the context window and the budgets or refuse it
+        model = model_id(lm)
+        expected_output = DEFAULT_STAGE_OUTPUT_TOKENS.get(stage, 1500)
+        in_price = MODEL_PRICES.get(model, (0.0, 0.0))[0]
+        output_cost = estimate_cost(model, 0, expected_output)
+        
+        max_input = MODEL_CONTEXT_LIMITS.get(model, 128000) - expected_output
+        reason = "context window"
+        for budget in self.budgets:
+            remaining = budget.remaining() - output_cost
+            if remaining <= 0:
+                raise BudgetExceeded(f"{budget.name} exhausted before {position} {stage}")
+            if in_price > 0:
+                affordable = int(remaining * 1_000_000 / in_price)
+                if affordable < max_input:
+                    max_input = affordable
+                    reason = budget.name
+        
+        input_tokens = estimate_tokens(prompt)
+        if input_tokens <= max_input:
+            return prompt
+        
+        action = {"position": position, "stage": stage, "reason": reason, "policy": self.policy,
+                  "input_tokens": input_tokens, "limit": max_input}
+        with self.lock:
+            self.budget_actions.append(action)
+        print(f"    [Budget] {position} {stage}: ~{input_tokens:,} tokens over {reason} limit {max_input:,} ({self.policy})")
+        # a prompt cut below a quarter of its size is not worth sending
+        if self.policy == "skip" or max_input < input_tokens // 4:
+            raise BudgetExceeded(f"{position} {stage} needs ~{input_tokens:,} input tokens, {reason} allows {max_input:,}")
+        if self.policy == "compress":
+            return compress_text(prompt, max_input)
+        return truncate_text(prompt, max_input)
+
+    def record(self, stage, position, lm, prompt, response, latency, expected_tokens=None, max_tokens=None):
+        model = model_id(lm)
+        input_tokens = estimate_tokens(prompt)
+        output_tokens = estimate_tokens(response)
+        call = {
+            "debate_id": self.debate_id,
+            "stage": stage,
+            "position": position,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency": round(latency, 3),
+            "cost": estimate_cost(model, input_tokens, output_tokens)
+        }
+        if max_tokens:
+            call["max_tokens"] = max_tokens
+            call["truncated"] = output_is_truncated(output_tokens, max_tokens)
+            call["overrun"] = output_tokens > expected_tokens
+        with self.lock:
+            self.calls.append(call)
+        for budget in self.budgets:
+            budget.charge(call["cost"])
+        if self.log_path:
+            with _CALL_LOG_LOCK:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(call) + "\n")
+        return call
+
+    def summary(self):
+        with self.lock:
+            calls = list(self.calls)
+        return {
+            "llm_calls": len(calls),
+            "input_tokens": sum(c["input_tokens"] for c in calls),
+            "output_tokens": sum(c["output_tokens"] for c in calls),
+            "est_cost_usd": round(sum(c["cost"] for c in calls), 4),
+            "llm_seconds": round(sum(c["latency"] for c in calls), 1),
+            "budget_actions": len(self.budget_actions),
+            **({"output_truncations": sum(1 for c in calls if c.get("truncated")),
+                "output_overruns": sum(1 for c in calls if c.get("overrun"))}
+               if any("max_tokens" in c for c in calls) else {}),
+            **{f"{kind}_tokens_saved": tokens for kind, tokens in self.savings.items()},
+            **{f"{kind}_hits": count for kind, count in self.hits.items()},
+            **{f"{kind}_fallbacks": count for kind, count in self.fallbacks.items()},
+            **self.counts,
+            "stage_models_used": json.dumps(self.stage_models_used(calls), sort_keys=True)
+        }
+
+    @staticmethod
+    def stage_models_used(calls):
+        # which model actually served each stage, per team, e.g. {"opp:extract": "gpt-4o-mini"}
+        used = {}
+        for c in calls:
+            team = c["position"].split("_")[0]
+            key = f"{team}:{c['stage']}" if team in ["prop", "opp"] else c["stage"]
+            models = used.setdefault(key, [])
+            if c["model"] not in models:
+                models.append(c["model"])
+        return {key: ",".join(models) for key, models in used.items()}
+
+
+# speaker stages that can be routed to a different model (the judge has its own -jm)
+ROUTABLE_STAGES = ["speech", "digest", "extract", "bucket", "refute", "rebut", "parse", "slot_fill", "generate", "cluster",
+                   "synthesize", "outline", "section"]
+
+def parse_stage_models(pairs):
+    routing = {}
+    for pair in pairs or []:
+        stage, _, model = pair.partition("=")
+        if stage not in ROUTABLE_STAGES or not model:
+            raise ValueError(f"Bad stage route '{pair}', expected STAGE=MODEL with STAGE in {ROUTABLE_STAGES}")
+        routing[stage] = model
+    return routing
+
+class SpeechDigestCache:
+    # one digest per distinct speech, keyed by its hash, shared by every later speaker (and every debate in a worker)
+    def __init__(self, path=None):
+        self.path = path
+        self.digests = {}
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as f:
+                self.digests = json.load(f)
+
+    @staticmethod
+    def key(speech):
+        return hashlib.sha256(speech.encode("utf-8")).hexdigest()
+
+    def get(self, speech):
+        with self.lock:
+            return self.digests.get(self.key(speech))
+
+    def put(self, speech, digest):
+        with self.lock:
+            self.digests[self.key(speech)] = digest
+            if self.path:
+                with open(self.path, 'w') as f:
+                    json.dump(self.digests, f)
+
+DIGEST_CACHE = SpeechDigestCache()
+
+class ArtifactStore:
+    # every stage output, keyed by a hash of (stage, model, full prompt). the prompt already holds the stage's
+    # template and its inputs, so editing one template misses only that stage, and the stages that read its
+    # output miss because their inputs changed; everything upstream is reused.
+    # memory keeps the max_entries most recently used artifacts (a --serve worker runs for days); with a path,
+    # evicted ones are read back from disk
+    def __init__(self, path=None, max_entries=2000):
+        self.path = path
+        self.max_entries = max_entries
+        self.artifacts = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _remember(self, key, artifact):
+        # caller holds the lock
+        self.artifacts[key] = artifact
+        self.artifacts.move_to_end(key)
+        while len(self.artifacts) > self.max_entries:
+            self.artifacts.popitem(last=False)
+
+    @staticmethod
+    def key(stage, model, prompt, variant=None):
+        # a sampled variant gets its own entry; unsampled outputs keep the plain key
+        fields = [stage, model, prompt] + ([variant] if variant is not None else [])
+        return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()
+
+    def _file(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, stage, model, prompt, variant=None):
+        key = self.key(stage, model, prompt, variant)
+        with self.lock:
+            artifact = self.artifacts.get(key)
+            if artifact is not None:
+                self.artifacts.move_to_end(key)
+        if artifact is None and self.path and os.path.exists(self._file(key)):
+            with open(self._file(key)) as f:
+                artifact = json.load(f)
+            with self.lock:
+                self._remember(key, artifact)
+        return artifact["output"] if artifact else None
+
+    def put(self, stage, model, prompt, output, position=None, template=None, structured=None, variant=None):
+        key = self.key(stage, model, prompt, variant)
+        artifact = {
+            "stage": stage,
+            "model": model,
+            "position": position,
+            "variant": variant,
+            "template_hash": hashlib.sha256(template.encode("utf-8")).hexdigest()[:12] if template else None,
+            "prompt": prompt,
+            "output": output,
+            "structured": structured,
+            "created": time.time()
+        }
+        with self.lock:
+            self._remember(key, artifact)
+        if self.path:
+            os.makedirs(os.path.dirname(self._file(key)), exist_ok=True)
+            _write_json_atomic(self._file(key), artifact)
+
+ARTIFACT_STORE = ArtifactStore()
+
+class RequestRateLimiter:
+    # per-model requests-per-minute limits, charged once per llm call (a stage node can make several calls,
+    # on several models, and a node answered from the artifact store makes none)
+    def __init__(self, limits=None):
+        self.limits = limits or {}
+        self.recent = {}
+        self.lock = threading.Lock()
+
+    def _prune(self, model, now):
+        self.recent[model] = [t for t in self.recent.get(model, []) if now - t < 60]
+        return self.recent[model]
+
+    def available(self, model):
+        limit = self.limits.get(model)
+        if not limit:
+            return True
+        with self.lock:
+            return len(self._prune(model, time.time())) < limit
+
+    def acquire(self, model):
+        limit = self.limits.get(model)
+        if not limit:
+            return
+        while True:
+            with self.lock:
+                now = time.time()
+                recent = self._prune(model, now)
+                if len(recent) < limit:
+                    recent.append(now)
+                    return
+                wait = 60 - (now - recent[0])
+            time.sleep(max(wait, 0.05))
+
+RATE_LIMITER = RequestRateLimiter()
+
+def load_artifacts(path, stage=None):
+    # an --artifact-dir as a DataFrame (one row per stage output, structured ir where there is one), for notebooks
+    artifacts = []
+    for artifact_file in glob.glob(os.path.join(path, "*", "*.json")):
+        with open(artifact_file) as f:
+            artifact = json.load(f)
+        if stage is None or artifact["stage"] == stage:
+            artifacts.append(artifact)
+    return pd.DataFrame(artifacts)
+
+_PROMPT_FILES = {}
+
+def load_prompt_file(path):
+    if path not in _PROMPT_FILES:
+        with open(path) as f:
+            _PROMPT_FILES[path] = f.read()
+    return _PROMPT_FILES[path]
 
 class DebateSpeaker:
-    def __init__(self, lm, speaker_position: str, architecture: str):
+    def __init__(self, lm, speaker_position: str, architecture: str, tracker=None, options=None, stage_lms=None,
+                 variant=None):
         self.lm = lm
+        self.variant = variant
+        self.stage_lms = stage_lms or {}
+        self.tracker = tracker
+        self.options = options or PipelineOptions()
         self.speaker_position = speaker_position
         self.architecture = architecture
         self.team = "Proposition" if "prop" in speaker_position else "Opposition"
@@ -248,13 +1034,66 @@ class DebateSpeaker:
         }
         self.role_name = roles.get(speaker_position, "Debater")
 
-    def _call_llm(self, prompt):
-        print(f"DEBUG: calling LLM for {self.role_name}...")
-        with dspy.context(lm=self.lm):
-            response = self.lm(prompt=prompt)
+    def output_budget(self, stage, lm, target_words=None):
+        # (expected tokens, max_tokens) or (None, None); reasoning models spend max_tokens on hidden reasoning too
+        budgets = self.options.output_budgets
+        if not budgets or model_id(lm) in REASONING_MODELS:
+            return None, None
+        if target_words:
+            expected = int(target_words * TOKENS_PER_WORD)
+        else:
+            expected = budgets.get(f"{stage}:{self.speaker_position}") or budgets.get(stage)
+        if not expected:
+            return None, None
+        return expected, int(expected * self.options.cap_margin)
+
+    def _call_llm(self, prompt, stage="speech", template=None, ir=None, target_words=None):
+        lm = self.stage_lms.get(stage, self.lm)
+        compact = ir is not None and self.options.ir_mode == "compact"
+        if compact:
+            prompt = f"{prompt}\n\n{IR_FORMATS[ir]}"
+        if self.tracker:
+            prompt = self.tracker.preflight(stage, self.speaker_position, lm, prompt)
+        expected_tokens, max_tokens = self.output_budget(stage, lm, target_words)
+        # in a sampled study every variant samples its speeches the same way, under its own cache key
+        variant = self.variant if stage in SAMPLED_STAGES else None
+        stored = ARTIFACT_STORE.get(stage, model_id(lm), prompt, variant)
+        if stored is not None:
+            print(f"DEBUG: reusing stored {stage} for {self.role_name}")
+            if self.tracker:
+                self.tracker.note_hit("artifact", estimate_tokens(prompt) + estimate_tokens(stored))
+            response = stored
+        else:
+            print(f"DEBUG: calling LLM for {self.role_name} ({stage} on {model_id(lm)})...")
+            # rollout_id only separates dspy cache entries; it is not sent to the api
+            call_kwargs = {"temperature": SAMPLE_TEMPERATURE, "rollout_id": variant} if variant is not None else {}
+            if max_tokens:
+                call_kwargs["max_tokens"] = max_tokens
+            RATE_LIMITER.acquire(model_id(lm))
+            started = time.time()
+            with dspy.context(lm=lm):
+                response = lm(prompt=prompt, **call_kwargs)
             if isinstance(response, list):
-                return response[0] if response else ""
+                response = response[0] if response else ""
+            if self.tracker:
+                self.tracker.record(stage, self.speaker_position, lm, prompt, response, time.time() - started,
+                                    expected_tokens=expected_tokens, max_tokens=max_tokens)
+            if max_tokens and output_is_truncated(estimate_tokens(response), max_tokens):
+                print(f"    [Warning] {stage} output for {self.role_name} hit its {max_tokens} token cap")
+        structured = parse_ir(ir, response) if compact else None
+        # a cut-off output is not worth reusing
+        truncated = stored is None and max_tokens and output_is_truncated(estimate_tokens(response), max_tokens)
+        if stored is None and not truncated:
+            ARTIFACT_STORE.put(stage, model_id(lm), prompt, response, position=self.speaker_position, template=template,
+                               structured=structured, variant=variant)
+        if not compact:
+            return response
+        if structured is None:
+            print(f"    [Warning] {stage} output is not valid {ir} json, passing it on as prose")
+            if self.tracker:
+                self.tracker.note_fallback("ir")
             return response
+        return serialize_ir(ir, structured)
 
     def generate_speech(self, motion, teammate_speech, opponent_speeches):
         if self.architecture == "baseline":
@@ -266,289 +1105,1299 @@ class DebateSpeaker:
         else:
             return self._generate_enhanced(motion, teammate_speech, opponent_speeches)
 
+    def is_multistage(self):
+        return self.architecture in ["enhanced", "schema_guided"]
+
+    def has_rebuttal(self):
+        return self.is_multistage() and self.speaker_number in [2, 3]
+
+    def has_independent_case(self):
+        # constructive material that never looks at the opponents' speeches
+        return self.architecture in ["enhanced", "schema_guided"] and self.speaker_number in [1, 2]
+
+    def case_needs_teammate(self):
+        # schema_guided slot filling only needs the motion; enhanced 2nd speakers filter against their partner
+        return self.architecture == "enhanced" and self.speaker_number == 2
+
+    def prepare_case(self, motion, teammate_speech=None):
+        if not self.has_independent_case():
+            return ""
+        if self.architecture == "schema_guided":
+            return self._build_schema_case(motion)
+        return self._build_generated_case(motion, teammate_speech)
+
+    def _digest_speech(self, speech):
+        digest = DIGEST_CACHE.get(speech)
+        if digest is None:
+            print(f"    [Speech Digest Active]")
+            digest_input = f"SPEECH:\n{speech}\n\nINSTRUCTIONS:\n{SPEECH_DIGEST_PROMPT}"
+            digest = self._call_llm(digest_input, stage="digest", template=SPEECH_DIGEST_PROMPT)
+            DIGEST_CACHE.put(speech, digest)
+            if self.tracker:
+                # the digest call itself is paid out of the saving, so context_tokens_saved is net
+                self.tracker.note_saving("context", -(estimate_tokens(digest_input) + estimate_tokens(digest)))
+        return digest
+
+    def _format_opponent_context(self, opponent_speeches):
+        if not opponent_speeches:
+            return ""
+        context = "Opponent Speeches:\n"
+        num_full = max(0, self.options.keep_recent)
+        for i, speech in enumerate(opponent_speeches):
+            if self.options.context_mode == "digest" and i < len(opponent_speeches) - num_full:
+                digest = self._digest_speech(speech)
+                if self.tracker:
+                    self.tracker.note_saving("context", estimate_tokens(speech) - estimate_tokens(digest))
+                context += f"Opponent {i+1} (digest):\n{digest}\n\n"
+            else:
+                context += f"Opponent {i+1}:\n{speech}\n\n"
+        return context
+
     def _generate_baseline(self, motion, teammate_speech, opponent_speeches):
         prompt = BASELINE_PROMPTS[self.speaker_position]
         context = f"Motion: {motion}\n\n"
         if teammate_speech:
             context += f"Your Partner's Speech:\n{teammate_speech}\n\n"
-        if opponent_speeches:
-            context += "Opponent Speeches:\n"
-            for i, speech in enumerate(opponent_speeches):
-                context += f"Opponent {i+1}:\n{speech}\n\n"
+        context += self._format_opponent_context(opponent_speeches)
         
         full_prompt = f"{context}{prompt}\n\nYour Speech:"
-        return self._call_llm(full_prompt)
+        return self._call_llm(full_prompt, stage="speech", template=prompt)
 
     def _generate_detailed_prompts(self, motion, teammate_speech, opponent_speeches):
         prompt = DETAILED_PROMPTS[self.speaker_position]
         context = f"Motion: {motion}\n\n"
-        
         if teammate_speech:
             context += f"Your Partner's Speech:\n{teammate_speech}\n\n"
-        if opponent_speeches:
-            context += "Opponent Speeches:\n"
-            for i, speech in enumerate(opponent_speeches):
-                context += f"Opponent {i+1}:\n{speech}\n\n"
+        context += self._format_opponent_context(opponent_speeches)
         
         full_prompt = f"{context}{prompt}\n\nYour Speech:"
-        result = self._call_llm(full_prompt)
+        result = self._call_llm(full_prompt, stage="speech", template=prompt)
         print(f"DEBUG: generated {len(result.split())} words")
         return result
 
     def _generate_schema_guided(self, motion, teammate_speech, opponent_speeches):
-        clustered_threats = ""
-        if self.speaker_number in [2, 3]:
-            num_buckets = 2 if self.speaker_number == 2 else 3
-            opp_transcript = "\n\n".join(opponent_speeches)
-            
-            extraction_prompt = EXTRACT_PROMPT.format(NUM_BUCKETS=num_buckets)
-            extraction_input = f"TRANSCRIPT TO ANALYZE:\n{opp_transcript}\n\nINSTRUCTIONS:\n{extraction_prompt}"
-            
-            print(f"    [Extraction Layer Active]")
-            clustered_threats = self._call_llm(extraction_input)
-
-        refutations_map = ""
-        if clustered_threats:
-            refutation_prompt = REFUTE_PROMPT.format(SPEAKER_ROLE=self.role_name)
-            refutation_input = f"THREATS TO DESTROY:\n{clustered_threats}\n\nINSTRUCTIONS:\n{refutation_prompt}"
-            
-            print(f"    [Refutation Layer Active]")
-            refutations_map = self._call_llm(refutation_input)
-
-        new_case = ""
-        if self.speaker_number in [1, 2]:
-            parser_prompt = PARSER_PROMPT.format(motion=motion)
-            print(f"    [Semantic Parsing Active]")
-            parsing_result = self._call_llm(parser_prompt)
-            
-            domain = "Economics"
-            for line in parsing_result.split('\n'):
-                if "Domain:" in line:
-                    domain = line.split("Domain:")[1].strip()
-                    break
-            
-            print(f"    [Logic Retrieval Active] Domain: {domain}")
-            
-            schemas = []
-            for entry in LOGIC_STORE:
-                if entry["domain"].lower() in domain.lower() or domain.lower() in entry["domain"].lower():
-                    schemas = entry["mechanisms"]
-                    break
-            
-            if not schemas:
-                print(f"    [Warning] Domain not found in Logic Store. Using default.")
-                schemas = LOGIC_STORE[0]["mechanisms"]
-            
-            print(f"    [Schema-Guided Generation Active] Applying {len(schemas)} schemas...")
-            generated_arguments = []
-            for schema in schemas:
-                filler_prompt = SLOT_FILLER_PROMPT.format(
-                    motion=motion,
-                    schema_name=schema["name"],
-                    logic_template=schema["logic_template"]
-                )
-                argument = self._call_llm(filler_prompt)
-                generated_arguments.append(f"### Argument: {schema['name']}\n{argument}")
-            
-            new_case = "\n\n".join(generated_arguments)
+        refutations_map = self.rebut(opponent_speeches)
+        new_case = self.prepare_case(motion, teammate_speech)
+        return self.synthesize(motion, refutations_map, new_case)
 
+    def _generate_enhanced(self, motion, teammate_speech, opponent_speeches):
+        refutations_map = self.rebut(opponent_speeches)
+        new_case = self.prepare_case(motion, teammate_speech)
+        return self.synthesize(motion, refutations_map, new_case)
+
+    def rebut(self, opponent_speeches):
+        if self.options.rebuttal_mode == "fused":
+            return self.fused_rebuttal(opponent_speeches)
+        return self.refute_threats(self.extract_threats(opponent_speeches))
+
+    def fused_rebuttal(self, opponent_speeches):
+        if not self.has_rebuttal():
+            return ""
+        fused_prompt = FUSED_REBUTTAL_PROMPT.format(SPEAKER_ROLE=self.role_name, NUM_BUCKETS=self.num_buckets(),
+                                                    NUM_RESPONSES=self.num_responses())
+        opp_transcript = "\n\n".join(opponent_speeches)
+        fused_input = f"TRANSCRIPT TO ANALYZE:\n{opp_transcript}\n\nINSTRUCTIONS:\n{fused_prompt}"
+        
+        print(f"    [Fused Extraction-Refutation Layer Active]")
+        return self._call_llm(fused_input, stage="rebut", template=FUSED_REBUTTAL_PROMPT, ir="refutations")
+
+    def extract_threats(self, opponent_speeches):
+        if not self.has_rebuttal():
+            return ""
+        if self.options.extraction_mode == "incremental":
+            return self.bucket_ideas(merge_ranked_ideas([self.extract_speech_ideas(s) for s in opponent_speeches]))
+        num_buckets = self.num_buckets()
+        opp_transcript = "\n\n".join(opponent_speeches)
+        
+        extraction_prompt = EXTRACT_PROMPT.format(NUM_BUCKETS=num_buckets)
+        extraction_input = f"TRANSCRIPT TO ANALYZE:\n{opp_transcript}\n\nINSTRUCTIONS:\n{extraction_prompt}"
+        
+        print(f"    [Extraction Layer Active]")
+        return self._call_llm(extraction_input, stage="extract", template=EXTRACT_PROMPT, ir="threats")
+
+    def extract_speech_ideas(self, speech):
+        # independent of who asks, so every later speaker reuses it (artifact store, or the shared graph node)
+        print(f"    [Speech Extraction Active]")
+        return self._call_llm(f"SPEECH TO ANALYZE:\n{speech}\n\nINSTRUCTIONS:\n{SPEECH_EXTRACT_PROMPT}", stage="extract",
+                              template=SPEECH_EXTRACT_PROMPT)
+
+    def bucket_ideas(self, ranked_ideas):
+        bucket_prompt = BUCKET_PROMPT.format(NUM_BUCKETS=self.num_buckets())
+        print(f"    [Bucketing Layer Active]")
+        return self._call_llm(f"RANKED IDEAS:\n{ranked_ideas}\n\nINSTRUCTIONS:\n{bucket_prompt}", stage="bucket",
+                              template=BUCKET_PROMPT, ir="threats")
+
+    def num_buckets(self):
+        return 2 if self.speaker_number == 2 else 3
+
+    def num_responses(self):
+        # responses per idea, as REFUTE_PROMPT asks of 2nd and 3rd speakers
+        return 2 if self.speaker_number == 2 else 3
+
+    def refute_threats(self, clustered_threats):
+        if not clustered_threats:
+            return ""
+        if self.options.refute_mode == "per_bucket":
+            with ThreadPoolExecutor(max_workers=self.num_buckets()) as pool:
+                parts = list(pool.map(lambda i: self.refute_bucket(clustered_threats, i), range(self.num_buckets())))
+            return merge_refutations(parts)
+        return self._refute(clustered_threats)
+
+    def refute_bucket(self, clustered_threats, index):
+        # bucket `index` of num_buckets(); the last one also takes any extra buckets the extractor made
+        buckets = parse_buckets(clustered_threats)
+        if not buckets:
+            # nothing recognisable as buckets: refute it whole, once
+            return self._refute(clustered_threats) if index == 0 and clustered_threats else ""
+        if index >= len(buckets):
+            return ""
+        last = index == self.num_buckets() - 1
+        return self._refute("\n".join(buckets[index:]) if last else buckets[index])
+
+    def _refute(self, threats):
+        refutation_prompt = REFUTE_PROMPT.format(SPEAKER_ROLE=self.role_name)
+        refutation_input = f"THREATS TO DESTROY:\n{threats}\n\nINSTRUCTIONS:\n{refutation_prompt}"
+        
+        print(f"    [Refutation Layer Active]")
+        return self._call_llm(refutation_input, stage="refute", template=REFUTE_PROMPT, ir="refutations")
+
+    def _dedup_refutations(self, refutations_map):
+        started = time.time()
+        deduped, removed, total = dedup_items(refutations_map, self.options.response_dedup)
+        saved = estimate_tokens(refutations_map) - estimate_tokens(deduped)
+        print(f"    [Dedup] dropped {removed} of {total} items (~{saved} tokens) in {(time.time() - started) * 1000:.1f} ms")
+        if self.tracker:
+            self.tracker.note_saving("dedup", saved)
+        return deduped
+
+    def _build_schema_case(self, motion):
+        parser_prompt = PARSER_PROMPT.format(motion=motion)
+        print(f"    [Semantic Parsing Active]")
+        parsing_result = self._call_llm(parser_prompt, stage="parse", template=PARSER_PROMPT)
+        
+        domain = "Economics"
+        for line in parsing_result.split('\n'):
+            if "Domain:" in line:
+                domain = line.split("Domain:")[1].strip()
+                break
+        
+        print(f"    [Logic Retrieval Active] Domain: {domain}")
+        
+        schemas = []
+        for entry in LOGIC_STORE:
+            if entry["domain"].lower() in domain.lower() or domain.lower() in entry["domain"].lower():
+                schemas = entry["mechanisms"]
+                break
+        
+        if not schemas:
+            print(f"    [Warning] Domain not found in Logic Store. Using default.")
+            schemas = LOGIC_STORE[0]["mechanisms"]
+        
+        print(f"    [Schema-Guided Generation Active] Applying {len(schemas)} schemas...")
+        filled = self._fill_schemas_batched(motion, schemas) if self.options.slot_fill_mode == "batched" else {}
+        generated_arguments = []
+        for schema in schemas:
+            argument = filled.get(schema["name"]) or self._fill_schema(motion, schema)
+            generated_arguments.append(f"### Argument: {schema['name']}\n{argument}")
+        
+        return "\n\n".join(generated_arguments)
+
+    def _fill_schema(self, motion, schema):
+        filler_prompt = SLOT_FILLER_PROMPT.format(
+            motion=motion,
+            schema_name=schema["name"],
+            logic_template=schema["logic_template"]
+        )
+        return self._call_llm(filler_prompt, stage="slot_fill", template=SLOT_FILLER_PROMPT)
+
+    def _fill_schemas_batched(self, motion, schemas):
+        # one call for every schema; names missing from the reply are filled one by one by the caller
+        templates = "\n".join(f'- Schema Name: "{schema["name"]}"\n  Logic Template: "{schema["logic_template"]}"'
+                               for schema in schemas)
+        batch_prompt = BATCH_SLOT_FILLER_PROMPT.format(motion=motion, templates=templates)
+        response = self._call_llm(batch_prompt, stage="slot_fill", template=BATCH_SLOT_FILLER_PROMPT)
+        filled = parse_keyed_arguments(response, [schema["name"] for schema in schemas])
+        missing = len(schemas) - len(filled)
+        if missing:
+            print(f"    [Warning] Batched slot filling missed {missing} schemas, filling them one by one")
+            if self.tracker:
+                self.tracker.note_fallback("slot_fill", missing)
+        return filled
+
+    def brainstorm_fragments(self, motion):
+        # split mode, step 1: needs only the motion, so it can start before the teammate has spoken
+        fragment_prompt = FRAGMENT_PROMPT.format(motion=motion, side=self.team, role=self.role_name)
+        print(f"    [Fragment Generation Active]")
+        response = self._call_llm(fragment_prompt, stage="generate", template=FRAGMENT_PROMPT)
+        fragments = parse_fragments(response)
+        if not fragments:
+            print(f"    [Warning] Fragments did not parse, falling back to ARG_GEN_PROMPT")
+            if self.tracker:
+                self.tracker.note_fallback("fragments")
+        return fragments
+
+    def uses_split_generation(self):
+        return self.architecture == "enhanced" and (self.options.generation_mode == "split" or self.options.fragment_pool)
+
+    def cluster_case(self, motion, fragments, teammate_speech):
+        # split mode, step 2: local phase 2 (teammate overlap) and ranking, then only the survivors are clustered
+        if not fragments:
+            return self._build_generated_case(motion, teammate_speech, split=False)
+        survivors = filter_fragments(fragments, teammate_speech, self.options.mechanism_overlap)
+        print(f"    [Fragment Filter] kept {len(survivors)} of {len(fragments)} fragments")
+        if not survivors:
+            survivors = sorted(fragments, key=lambda f: -f["strength"])
+        return self._cluster(motion, survivors)
+
+    def draw_from_pool(self, motion, pool, teammate_speech):
+        # 2nd speaker: the first speaker's fragments below its top picks, minus anything its speech covered
+        leftovers = sorted(pool or [], key=lambda f: -f["strength"])[POOL_RESERVED_FRAGMENTS:]
+        survivors = filter_fragments(leftovers, teammate_speech, self.options.mechanism_overlap)
+        if len(survivors) < POOL_MIN_FRAGMENTS:
+            print(f"    [Fragment Pool] {len(survivors)} unused fragments left, brainstorming afresh")
+            return self.cluster_case(motion, self.brainstorm_fragments(motion), teammate_speech)
+        print(f"    [Fragment Pool] drawing the extension from {len(survivors)} unused fragments")
+        if self.tracker:
+            self.tracker.note_hit("fragment_pool", DEFAULT_STAGE_OUTPUT_TOKENS["generate"])
+        return self._cluster(motion, survivors)
+
+    def _cluster(self, motion, survivors):
+        cluster_prompt = CLUSTER_PROMPT.format(role=self.role_name)
+        cluster_input = f"Motion: {motion}\nSide: {self.team}\n\nFRAGMENTS:\n{serialize_fragments(survivors)}\n\nINSTRUCTIONS:\n{cluster_prompt}"
+        print(f"    [Clustering Layer Active]")
+        return self._call_llm(cluster_input, stage="cluster", template=CLUSTER_PROMPT, ir="case")
+
+    def _build_generated_case(self, motion, teammate_speech, split=True):
+        if split and self.uses_split_generation():
+            return self.cluster_case(motion, self.brainstorm_fragments(motion), teammate_speech)
+        generation_input = f"Motion: {motion}\nSide: {self.team}\nRole: {self.role_name}\n"
+        if teammate_speech:
+            generation_input += f"Teammate's Previous Speech:\n{teammate_speech}\n"
+        
+        generation_input += f"\nINSTRUCTIONS:\n{ARG_GEN_PROMPT}"
+        
+        print(f"    [Generation Layer Active]")
+        return self._call_llm(generation_input, stage="generate", template=ARG_GEN_PROMPT, ir="case")
+
+    def synthesize(self, motion, refutations_map, new_case):
+        if refutations_map and self.options.response_dedup > 0:
+            refutations_map = self._dedup_refutations(refutations_map)
+        if self.options.synthesis_mode == "sections":
+            plan = self.outline_speech(motion, refutations_map, new_case, dedup=False)
+            with ThreadPoolExecutor(max_workers=len(plan["sections"])) as pool:
+                parts = list(pool.map(lambda i: self.write_section(motion, plan, new_case, i), range(len(plan["sections"]))))
+            return self.stitch_sections(parts)
         synthesis_input = f"Motion: {motion}\nRole: {self.role_name}\n"
         if refutations_map:
             synthesis_input += f"\nREFUTATION INGREDIENTS:\n{refutations_map}\n"
         if new_case:
             synthesis_input += f"\nCONSTRUCTIVE INGREDIENTS:\n{new_case}\n"
             
-        synthesis_input += f"\nINSTRUCTIONS:\n{SYNTH_PROMPT}"
+        synth_prompt = load_prompt_file(self.options.synth_prompt_file) if self.options.synth_prompt_file else SYNTH_PROMPT
+        synthesis_input += f"\nINSTRUCTIONS:\n{synth_prompt}"
         
         print(f"    [Speech Synthesizer Active]")
-        result = self._call_llm(synthesis_input)
+        result = self._call_llm(synthesis_input, stage="synthesize", template=synth_prompt)
         print(f"DEBUG: generated {len(result.split())} words")
         return result
 
-    def _generate_enhanced(self, motion, teammate_speech, opponent_speeches):
-        clustered_threats = ""
-        if self.speaker_number in [2, 3]:
-            num_buckets = 2 if self.speaker_number == 2 else 3
-            opp_transcript = "\n\n".join(opponent_speeches)
-            
-            extraction_prompt = EXTRACT_PROMPT.format(NUM_BUCKETS=num_buckets)
-            extraction_input = f"TRANSCRIPT TO ANALYZE:\n{opp_transcript}\n\nINSTRUCTIONS:\n{extraction_prompt}"
-            
-            print(f"    [Extraction Layer Active]")
-            clustered_threats = self._call_llm(extraction_input)
-
-        refutations_map = ""
-        if clustered_threats:
-            refutation_prompt = REFUTE_PROMPT.format(SPEAKER_ROLE=self.role_name)
-            refutation_input = f"THREATS TO DESTROY:\n{clustered_threats}\n\nINSTRUCTIONS:\n{refutation_prompt}"
-            
-            print(f"    [Refutation Layer Active]")
-            refutations_map = self._call_llm(refutation_input)
-
-        new_case = ""
-        if self.speaker_number in [1, 2]:
-            generation_input = f"Motion: {motion}\nSide: {self.team}\nRole: {self.role_name}\n"
-            if teammate_speech:
-                generation_input += f"Teammate's Previous Speech:\n{teammate_speech}\n"
-            
-            generation_input += f"\nINSTRUCTIONS:\n{ARG_GEN_PROMPT}"
-            
-            print(f"    [Generation Layer Active]")
-            new_case = self._call_llm(generation_input)
-
-        synthesis_input = f"Motion: {motion}\nRole: {self.role_name}\n"
+    def section_plan(self):
+        # (section name, target words); fixed by role so the graph knows the section count before the outline
+        body = 960
+        sections = [("Introduction", 120)]
+        if self.has_rebuttal():
+            share = body // 2 if self.has_independent_case() else body
+            sections += [(f"Rebuttal {i + 1}", share // self.num_buckets()) for i in range(self.num_buckets())]
+        if self.has_independent_case():
+            sections.append(("Constructive", body // 2 if self.has_rebuttal() else body))
+        sections.append(("Conclusion", 120))
+        return sections
+
+    def outline_speech(self, motion, refutations_map, new_case, dedup=True):
+        # the short planning call; returns the plan every section call shares
+        if dedup and refutations_map and self.options.response_dedup > 0:
+            refutations_map = self._dedup_refutations(refutations_map)
+        sections = self.section_plan()
+        outline_input = f"Motion: {motion}\nRole: {self.role_name}\n"
         if refutations_map:
-            synthesis_input += f"\nREFUTATION INGREDIENTS:\n{refutations_map}\n"
+            outline_input += f"\nREFUTATION INGREDIENTS:\n{refutations_map}\n"
         if new_case:
-            synthesis_input += f"\nCONSTRUCTIVE INGREDIENTS:\n{new_case}\n"
-            
-        synthesis_input += f"\nINSTRUCTIONS:\n{SYNTH_PROMPT}"
+            outline_input += f"\nCONSTRUCTIVE INGREDIENTS:\n{new_case}\n"
+        outline_prompt = OUTLINE_PROMPT.format(role=self.role_name, sections=", ".join(name for name, _ in sections))
+        outline_input += f"\nINSTRUCTIONS:\n{outline_prompt}"
         
-        print(f"    [Speech Synthesizer Active]")
-        result = self._call_llm(synthesis_input)
+        print(f"    [Speech Outline Active]")
+        response = self._call_llm(outline_input, stage="outline", template=OUTLINE_PROMPT)
+        planned = _ir_list(parse_json_value(response), "sections", "outline")
+        if len(planned) != len(sections) and self.tracker:
+            self.tracker.note_fallback("outline")
+        outline = []
+        for i, (name, words) in enumerate(sections):
+            item = planned[i] if i < len(planned) and isinstance(planned[i], dict) else {}
+            points = [p for p in (_ir_text(p, "point", "text") for p in _ir_list(item, "points")) if p]
+            outline.append({"name": name, "words": words, "title": _ir_text(item, "title") or name,
+                            "points": points, "signpost": _ir_text(item, "signpost")})
+        return {"sections": outline, "refutations": refutations_map}
+
+    def write_section(self, motion, plan, new_case, index):
+        section = plan["sections"][index]
+        outline = "\n".join(f"{i + 1}. {s['title']}: {'; '.join(s['points']) or s['name']}"
+                             + (f" [signpost: {s['signpost']}]" if s["signpost"] else "")
+                             for i, s in enumerate(plan["sections"]))
+        section_input = f"Motion: {motion}\nRole: {self.role_name}\n"
+        # each section sees only the ingredients it draws on
+        if section["name"].startswith("Rebuttal"):
+            buckets = parse_buckets(plan["refutations"])
+            bucket = int(section["name"].split()[1]) - 1
+            ingredients = buckets[bucket] if bucket < len(buckets) else plan["refutations"]
+            section_input += f"\nREFUTATION INGREDIENTS:\n{ingredients}\n"
+        elif section["name"] == "Constructive":
+            section_input += f"\nCONSTRUCTIVE INGREDIENTS:\n{new_case}\n"
+        section_prompt = SECTION_PROMPT.format(role=self.role_name, outline=outline,
+                                               section=f"{index + 1}. {section['title']}", words=section["words"])
+        section_input += f"\nINSTRUCTIONS:\n{section_prompt}"
+        
+        print(f"    [Section Writer Active] {section['name']}")
+        return self._call_llm(section_input, stage="section", template=SECTION_PROMPT, target_words=section["words"])
+
+    def stitch_sections(self, parts):
+        # local: drop headings the model added anyway and paragraphs repeated across section seams
+        paragraphs = []
+        for part in parts:
+            for paragraph in re.split(r"\n\s*\n", part or ""):
+                paragraph = "\n".join(line for line in paragraph.split("\n") if not re.match(r"^\s*(#+|\*\*[^*]+\*\*\s*$)", line))
+                paragraph = paragraph.strip()
+                if paragraph and (not paragraphs or paragraph != paragraphs[-1]):
+                    paragraphs.append(paragraph)
+        result = "\n\n".join(paragraphs)
         print(f"DEBUG: generated {len(result.split())} words")
         return result
 
-def judge_debate(motion, turns, judge_lm):
+_DAMAGE_RE = re.compile(r"\(?\s*damage(?: potential| score)?\s*[:=]?\s*(\d+)(?:\s*/\s*10)?\s*\)?", re.I)
+
+def parse_ranked_ideas(text):
+    # tolerant: any bulleted or numbered line is an idea; a missing damage score counts as 5
+    ideas = []
+    for line in text.split("\n"):
+        line = line.strip()
+        if not re.match(r"^([-*\u2022]|\d+[.)])\s*", line):
+            continue
+        description = re.sub(r"^([-*\u2022]|\d+[.)])\s*", "", line)
+        match = _DAMAGE_RE.search(description)
+        damage = int(match.group(1)) if match else 5
+        description = _DAMAGE_RE.sub("", description).strip()
+        if description:
+            ideas.append((damage, description))
+    return ideas
+
+def merge_ranked_ideas(extractions):
+    # per-speech idea lists -> one list ranked by damage, exact repeats dropped
+    merged = {}
+    for text in extractions:
+        ideas = parse_ranked_ideas(text)
+        if not ideas and text.strip():
+            ideas = [(5, text.strip())]
+        for damage, description in ideas:
+            key = re.sub(r"[^a-z0-9]+", " ", description.lower()).strip()
+            if key not in merged or merged[key][0] < damage:
+                merged[key] = (damage, description)
+    ranked = sorted(merged.values(), key=lambda idea: -idea[0])
+    return "\n".join(f"{i}. {description} (Damage: {damage})" for i, (damage, description) in enumerate(ranked, 1))
+
+def parse_json_object(text):
+    # the first {...} block in a reply, tolerating code fences and chatter around it; None if there is none
+    match = re.search(r"\{.*\}", text or "", re.S)
+    if not match:
+        return None
+    try:
+        data = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def parse_keyed_arguments(text, names):
+    # {"Schema Name": "paragraph"} -> only non-empty entries for the expected names, matched case-insensitively
+    data = parse_json_object(text) or {}
+    by_key = {str(key).strip().lower(): value for key, value in data.items()}
+    filled = {}
+    for name in names:
+        value = by_key.get(name.lower())
+        if isinstance(value, str) and value.strip():
+            filled[name] = value.strip()
+    return filled
+
+def _ir_list(data, *keys):
+    # the list itself, or the first list found under one of the keys
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in keys:
+            if isinstance(data.get(key), list):
+                return data[key]
+    return []
+
+def _ir_text(value, *keys):
+    # a field that may come back as a bare string or under a synonym
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        for key in keys:
+            if isinstance(value.get(key), str) and value[key].strip():
+                return " ".join(value[key].split())
+    return ""
+
+def _ir_rank(value):
+    rank = str(value or "").strip()[:1].upper()
+    return rank if rank in ["H", "M", "L"] else "M"
+
+def parse_json_value(text):
+    # like parse_json_object, but a reply may also be a bare list
+    text = text or ""
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if starts and text[min(starts)] == "[":
+        try:
+            return json.loads(text[min(starts):text.rfind("]") + 1])
+        except json.JSONDecodeError:
+            return None
+    return parse_json_object(text)
+
+def parse_ir(kind, text):
+    # reply -> normalized structure with ids, or None when nothing usable is in it
+    data = parse_json_value(text)
+    if data is None:
+        return None
+    
+    if kind == "threats":
+        buckets = []
+        for bucket in _ir_list(data, "buckets", "themes", "clusters"):
+            b = len(buckets) + 1
+            ideas = []
+            for idea in _ir_list(bucket, "ideas", "threats"):
+                claim = _ir_text(idea, "claim", "description", "idea", "text")
+                if claim:
+                    ideas.append({"id": f"B{b}.{len(ideas) + 1}", "claim": claim,
+                                  "type": _ir_text(idea, "type"), "rank": _ir_rank(idea.get("rank") if isinstance(idea, dict) else None)})
+            if ideas:
+                buckets.append({"id": f"B{b}", "theme": _ir_text(bucket, "theme", "name", "title") or f"Theme {b}",
+                                "ideas": ideas})
+        return {"buckets": buckets} if buckets else None
+    
+    if kind == "refutations":
+        refutations = []
+        for item in _ir_list(data, "refutations", "ideas", "responses"):
+            responses = [r for r in (_ir_text(r, "response", "text") for r in _ir_list(item, "responses", "rebuttals")) if r]
+            if responses:
+                refutations.append({"idea": _ir_text(item, "idea", "id") or f"R{len(refutations) + 1}",
+                                    "claim": _ir_text(item, "claim", "description"), "theme": _ir_text(item, "theme", "bucket"),
+                                    "responses": responses})
+        return {"refutations": refutations} if refutations else None
+    
+    arguments = []
+    for argument in _ir_list(data, "arguments", "contentions", "extensions"):
+        fragments = []
+        for fragment in _ir_list(argument, "fragments", "points"):
+            mechanism = _ir_text(fragment, "mechanism", "premise", "text")
+            if mechanism:
+                fragments.append({"mechanism": mechanism, "impact": _ir_text(fragment, "impact")})
+        tagline = _ir_text(argument, "tagline", "title", "name")
+        if tagline or fragments:
+            arguments.append({"id": f"A{len(arguments) + 1}", "tagline": tagline, "fragments": fragments})
+    return {"arguments": arguments} if arguments else None
+
+def serialize_ir(kind, data):
+    # one line per item; keeps "Bucket N (Theme)" headers so parse_buckets still splits threats and refutations
+    lines = []
+    if kind == "threats":
+        for i, bucket in enumerate(data["buckets"], 1):
+            lines.append(f"Bucket {i} ({bucket['theme']})")
+            lines += [f"- {idea['id']} [{idea['rank']}] {idea['claim']}" for idea in bucket["ideas"]]
+    elif kind == "refutations":
+        # a new bucket starts at a new idea-id bucket (B2.1 is bucket 2) or, without ids, a new theme
+        current = None
+        count = 0
+        for item in data["refutations"]:
+            match = re.match(r"B(\d+)\.", item["idea"])
+            key = f"B{match.group(1)}" if match else item["theme"] or current
+            if key != current or not lines:
+                current = key
+                count += 1
+                number = match.group(1) if match else count
+                lines.append(f"Bucket {number}" + (f" ({item['theme']})" if item["theme"] else ""))
+            lines.append(f"- {item['idea']} {item['claim']}".rstrip())
+            lines += [f"  > {response}" for response in item["responses"]]
+    else:
+        for argument in data["arguments"]:
+            lines.append(f"{argument['id']} {argument['tagline']}".rstrip())
+            lines += [f"- {f['mechanism']}" + (f" -> {f['impact']}" if f["impact"] else "") for f in argument["fragments"]]
+    return "\n".join(lines)
+
+_ITEM_RE = re.compile(r"^\s*(?:(?:[-*>\u2022]+|\d+[.)]|(?:response|idea)\s*\d+\s*:)\s*)+", re.I)
+
+def _shingles(text, k=2):
+    words = re.findall(r"[a-z0-9']+", text.lower())
+    return {tuple(words[i:i + k]) for i in range(max(1, len(words) - k + 1))}
+
+def dedup_items(text, threshold):
+    # drops list items (bullets, numbered lines, "Response 2: ...") whose word bigrams repeat an earlier kept item.
+    # maps hold tens of items, so exact pairwise jaccard is cheaper than minhash sketches. headers and short items stay
+    kept_lines = []
+    kept_shingles = []
+    removed = 0
+    total = 0
+    for line in text.split("\n"):
+        body = _ITEM_RE.sub("", line, count=1) if _ITEM_RE.match(line) else None
+        if body is None or len(body.split()) < 5:
+            kept_lines.append(line)
+            continue
+        total += 1
+        shingles = _shingles(body)
+        if any(len(shingles & other) / len(shingles | other) >= threshold for other in kept_shingles):
+            removed += 1
+            continue
+        kept_shingles.append(shingles)
+        kept_lines.append(line)
+    return "\n".join(kept_lines), removed, total
+
+def benchmark_dedup(texts, threshold, repeats=20):
+    # ms per map, to check the filter stays negligible next to an llm call
+    items = sum(dedup_items(t, threshold)[2] for t in texts)
+    started = time.time()
+    for _ in range(repeats):
+        for text in texts:
+            dedup_items(text, threshold)
+    elapsed = max(time.time() - started, 1e-9)
+    removed = sum(dedup_items(t, threshold)[1] for t in texts)
+    print(f"{len(texts)} maps, {items} items, {removed} dropped at threshold {threshold}")
+    print(f"{elapsed / (repeats * len(texts)) * 1000:.2f} ms per map, {items * repeats / elapsed:,.0f} items/sec")
+
+# a 1st speaker clusters at most its top 10 fragments; 2nd speakers need at least 3 for an extension
+POOL_RESERVED_FRAGMENTS = 10
+POOL_MIN_FRAGMENTS = 3
+
+def parse_fragments(text):
+    # ARG_GEN phase 1 as json -> [{"id", "premise", "mechanism", "impact", "strength"}]; [] if nothing parses
+    fragments = []
+    for item in _ir_list(parse_json_value(text), "fragments", "arguments"):
+        mechanism = _ir_text(item, "mechanism")
+        if not mechanism:
+            continue
+        strength = item.get("strength", 5) if isinstance(item, dict) else 5
+        try:
+            strength = float(strength)
+        except (TypeError, ValueError):
+            strength = 5.0
+        fragments.append({"id": f"F{len(fragments) + 1}", "premise": _ir_text(item, "premise"), "mechanism": mechanism,
+                          "impact": _ir_text(item, "impact"), "strength": strength})
+    return fragments
+
+def filter_fragments(fragments, teammate_speech, threshold):
+    # ARG_GEN phase 2 and 3 locally: drop fragments whose mechanism a teammate sentence already covers, strongest first
+    sentences = [_shingles(s) for s in re.split(r"(?<=[.!?])\s+", teammate_speech or "") if len(s.split()) >= 5]
+    survivors = []
+    for fragment in fragments:
+        mechanism = _shingles(fragment["mechanism"])
+        covered = max((len(mechanism & sentence) / len(mechanism) for sentence in sentences), default=0.0)
+        if covered < threshold:
+            survivors.append(fragment)
+    return sorted(survivors, key=lambda f: -f["strength"])
+
+def serialize_fragments(fragments):
+    return "\n".join(f"- {f['id']} [{f['strength']:g}] {f['premise']} | {f['mechanism']} -> {f['impact']}" for f in fragments)
+
+_BUCKET_HEADER_RE = re.compile(r"^\s*(?:[-*#\u2022]+\s*)?\**\s*Bucket\s*\d+", re.I)
+
+def parse_buckets(text):
+    # split an extraction into its "Bucket N (Theme)" sections; text before the first header is dropped
+    buckets = []
+    for line in (text or "").split("\n"):
+        if _BUCKET_HEADER_RE.match(line):
+            buckets.append(line)
+        elif buckets:
+            buckets[-1] += "\n" + line
+    return [b.strip() for b in buckets]
+
+def merge_refutations(parts):
+    # per-bucket maps back in bucket order
+    return "\n\n".join(part.strip() for part in parts if part and part.strip())
+
+def build_judge_prompt(motion, turns):
     transcript = f"Motion: {motion}\n\n"
     for turn in turns:
         transcript += f"\n--- {turn.team} Speaker {turn.speaker_number} ---\n{turn.speech}\n"
     
-    # wudc-style judging prompt
-    judge_prompt = f"""You are an Expert Debate Adjudicator
+    return JUDGE_PROMPT.format(transcript=transcript)
 
-You are tasked with judging a 3v3 debate between Proposition and Opposition teams. You must adopt the persona of the Ordinary Intelligent Voter (OIV) as defined by the WUDC Debating Manual.
-
-Your Persona and Disposition
-- Knowledge Base: You are a smart, generalist reader. You know basic geopolitical and social facts (e.g., you know Syria is in the Middle East), but you do not possess specialist or technical knowledge (e.g., you do not know specific legal precedents or complex economic formulas).
-- Open-Mindedness: You have no preformed views on the topic. You are cynical about mere assertions and require reasoned analysis to be persuaded.
-- Neutrality: You must not judge based on your personal preferences or political alignment. You judge solely on the persuasiveness of the arguments presented within the text.
-
-Your Evaluation Process
-You must evaluate the debate based on four weighted axes.
-
-1. Argumentation and Analysis (45%)
-- Logic over Assertion: Do not credit bare assertions. Credit arguments that provide mechanistic links - reasons why X leads to Y.
-- Impact: Credit teams that explain why an outcome matters (morally, practically, or emotionally).
-- Consistency: Check for contradictions. If a later speaker contradicts an earlier partner, ignore the later claim and stick to the team's original stance.
-- Plausibility: Reject claims that are factually absurd or logical leaps that an ordinary person would find impossible to believe.
-
-2. Engagement and Rebuttal (35%)
-- Direct Responsiveness: You must track which arguments were answered. If a team ignores a core argument from their opponents, you must treat that argument as conceded and true.
-- The Silence Rule: If Proposition proves X is true and Opposition never mentions X, then X is a fact in this debate. You must weigh this fact in your final decision.
-- Comparative Weighing: Give higher credit to teams that explicitly compare their impacts against their opponents' (e.g., Our impact affects fewer people but is a breach of a more important human right).
-
-3. Role Fulfillment (10%)
-- 1st Proposition: Must define the motion. If the definition is a squirrel (unfairly restrictive or logically impossible), penalize them heavily.
-- 1st Opposition: Must oppose the motion. They may defend the status quo or propose a counter-model.
-
-4. Clarity of Expression (10%)
-- Precision: Evaluate whether the meaning of the text is unambiguous.
-- Comprehensibility: The text must be clear enough for an average reader to follow the logic.
-- Note on Jargon: While you should not penalize the use of technical terms heavily, if a term renders an argument confusing to a layperson, treat the argument as less persuasive.
-
-Scoring Guide (Strict Adherence Required)
-
-You must assign a score between 50 and 100 to each speech. Be extremely strict. Do not succumb to grade inflation.
-
-- 90-100 (Legendary/Rare): Do not award this lightly. This score is reserved for the best speeches in human history. The argument is flawless, the rebuttal is devastating, and it is nearly impossible to imagine a better speech.
-- 85-89 (Exceptional): A very high bar. The speech addresses the core issues with sophisticated analysis and has almost no flaws.
-- 80-84 (Very Good): A high-quality speech. It is relevant, deeply analytical, and well-structured, but may have minor vulnerabilities.
-- 75-79 (Good/Competent): Relevant and logical, but may rely on some simplifications or miss minor nuances.
-- 70-74 (Beginner/Average): The speech is relevant but has significant logical gaps or relies on assertions rather than proof.
-- 60-69 (Below Average/Poor): Hard to follow, barely relevant, or logically confused.
-- 50-59 (Non-Functional): Irrelevant content or gibberish.
-
-Step-by-Step Decision Protocol
-
-1. Identify Claims: List the core arguments made by Proposition and Opposition.
-2. Filter Invalid Arguments:
-- Delete arguments based on knifing (contradicting partners).
-- Delete assertions that lack logical backing.
-3. Determine Truth:
-- Did the Opponent rebut Claim A?
-- If YES: Evaluate who had better analysis.
-- If NO: Claim A is true.
-4. Weigh Impacts: Compare the surviving impacts. Use the metrics provided by the teams. If no metrics were provided, use your common sense as an Ordinary Intelligent Voter.
-5. Score Each Speaker: Assign a score between 50-100 to each speaker based on the criteria above.
-6. Calculate Total Scores: Sum all speaker scores for each team.
-7. Declare Winner: THE TEAM WITH THE HIGHER TOTAL SCORE WINS. This is a mathematical determination based on the scores you assigned. If Proposition's total score is higher, Proposition wins. If Opposition's total score is higher, Opposition wins. You must follow this rule strictly.
-
---- DEBATE TRANSCRIPT ---
-{transcript}
---- END TRANSCRIPT ---
-
-Provide your evaluation in this EXACT format:
-
-PROPOSITION SPEAKER 1 SCORE: [score]
-OPPOSITION SPEAKER 1 SCORE: [score]
-PROPOSITION SPEAKER 2 SCORE: [score]
-OPPOSITION SPEAKER 2 SCORE: [score]
-PROPOSITION SPEAKER 3 SCORE: [score]
-OPPOSITION SPEAKER 3 SCORE: [score]
-WINNER: [Proposition/Opposition]
-REASON: [Your detailed RFD explaining why this team won]
-"""
+def call_judge(judge_lm, judge_prompt, tracker=None, position="judge", stage="judge", **call_kwargs):
+    if tracker:
+        judge_prompt = tracker.preflight(stage, position, judge_lm, judge_prompt)
     
+    RATE_LIMITER.acquire(model_id(judge_lm))
+    started = time.time()
     with dspy.context(lm=judge_lm):
-        response = judge_lm(prompt=judge_prompt)
+        response = judge_lm(prompt=judge_prompt, **call_kwargs)
     
     if isinstance(response, list):
         response = response[0] if response else ""
+    if tracker:
+        tracker.record(stage, position, judge_lm, judge_prompt, response, time.time() - started)
+    return response
+
+def judge_score_problems(response, num_turns):
+    # the score fields a verdict should have but does not, or has outside the rubric's 50-100
+    p_scores_map, o_scores_map, _ = _judge_fields(response)
+    problems = []
+    for i in range(1, num_turns + 1):
+        for team, scores_map in [("PROPOSITION", p_scores_map), ("OPPOSITION", o_scores_map)]:
+            if valid_judge_score(scores_map[i]) is None:
+                problems.append(f"{team} SPEAKER {i} SCORE")
+    return problems
+
+def call_judge_checked(judge_lm, judge_prompt, num_turns, tracker=None, position="judge", repair=True, **call_kwargs):
+    # a verdict with bad scores gets a short repair call over its own text; only if that fails is it judged again.
+    # a verdict still bad after that parses as winner "Invalid" (no totals), so it cannot decide the debate
+    response = call_judge(judge_lm, judge_prompt, tracker=tracker, position=position, **call_kwargs)
+    problems = judge_score_problems(response, num_turns)
+    if problems and repair:
+        response = _repair_judgement(judge_lm, judge_prompt, response, problems, num_turns, tracker, position, call_kwargs)
+        problems = judge_score_problems(response, num_turns)
+    if problems:
+        print(f"    [Judge Repair] {position}: no valid {', '.join(problems)}; verdict recorded as Invalid")
+        if tracker:
+            tracker.note_count("judge_invalid")
+    return response
+
+def _repair_judgement(judge_lm, judge_prompt, response, problems, num_turns, tracker, position, call_kwargs):
+    print(f"    [Judge Repair] {position}: asking again for {', '.join(problems)}")
+    if tracker:
+        tracker.note_count("judge_repairs")
+    repair_prompt = JUDGE_REPAIR_PROMPT.format(response=response, field_lines="\n".join(f"{p}: [score]" for p in problems))
+    repaired = response + "\n\n" + call_judge(judge_lm, repair_prompt, tracker=tracker, position=position,
+                                               stage="judge_repair")
+    if not judge_score_problems(repaired, num_turns):
+        return repaired
     
-    lines = response.strip().split('\n')
-    
-    # parse the scores from llm response
+    print(f"    [Judge Repair] {position}: repair incomplete, judging again")
+    if tracker:
+        tracker.note_count("judge_rejudges")
+    rejudged = call_judge(judge_lm, judge_prompt, tracker=tracker, position=position,
+                          **{**call_kwargs, "cache": False, "temperature": 1.0})
+    # both still bad: keep the more complete one as the raw response; it is invalid either way
+    return min([rejudged, repaired], key=lambda r: len(judge_score_problems(r, num_turns)))
+
+_JUDGE_SCORE_RE = re.compile(r"(proposition|opposition)\s+speaker\s*(\d+)\W*score\W*(\d+)", re.I)
+_JUDGE_REASON_RE = re.compile(r"^\W*reason\W*?:\W*(.*)", re.I)
+_JUDGE_WINNER_RE = re.compile(r"^\W*winner\b", re.I)
+
+def _judge_score(value):
+    # json scores may come back as strings or floats
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return None
+
+def _judge_fields(response):
+    # speaker number -> score (None when missing) for each team, plus the reason; json first, then the text format
     p_scores_map = {1: None, 2: None, 3: None}
     o_scores_map = {1: None, 2: None, 3: None}
     
+    json_reason = ""
+    data = parse_json_object(response)
+    if data and isinstance(data.get("prop_scores"), list) and isinstance(data.get("opp_scores"), list):
+        for scores_map, scores in [(p_scores_map, data["prop_scores"]), (o_scores_map, data["opp_scores"])]:
+            for i, score in enumerate(scores[:3]):
+                scores_map[i + 1] = _judge_score(score)
+        json_reason = str(data.get("reason") or "").strip()
+    
+    # score lines override json, and later lines earlier ones: a repair appended to a verdict fills its gaps
     reason_lines = []
     capturing_reason = False
-    
-    for line in lines:
-        lower_line = line.lower()
-        if "proposition speaker" in lower_line and "score:" in lower_line:
-            try:
-                parts = lower_line.split("proposition speaker")[1].split("score:")
-                speaker_num = int(parts[0].strip())
-                score = int(parts[1].strip().split()[0])
-                if speaker_num in p_scores_map:
-                    p_scores_map[speaker_num] = score
-            except:
-                pass
-        elif "opposition speaker" in lower_line and "score:" in lower_line:
-            try:
-                parts = lower_line.split("opposition speaker")[1].split("score:")
-                speaker_num = int(parts[0].strip())
-                score = int(parts[1].strip().split()[0])
-                if speaker_num in o_scores_map:
-                    o_scores_map[speaker_num] = score
-            except:
-                pass
-        elif line.startswith("REASON:"):
-            reason_lines.append(line.split("REASON:")[1].strip())
+    for line in (response or "").strip().split('\n'):
+        score = _JUDGE_SCORE_RE.search(line)
+        reason = _JUDGE_REASON_RE.match(line)
+        if score:
+            scores_map = p_scores_map if score.group(1).lower() == "proposition" else o_scores_map
+            if int(score.group(2)) in scores_map:
+                scores_map[int(score.group(2))] = int(score.group(3))
+        elif reason:
+            reason_lines.append(reason.group(1).strip())
             capturing_reason = True
-        elif capturing_reason and line.strip() and not line.upper().startswith("WINNER"):
+        elif capturing_reason and line.strip() and not _JUDGE_WINNER_RE.match(line):
             reason_lines.append(line.strip())
+    return p_scores_map, o_scores_map, json_reason or " ".join(reason_lines)
+
+# the scoring guide's range; anything outside it is a misread or a typo, not a score
+JUDGE_SCORE_RANGE = (50, 100)
+
+def valid_judge_score(score):
+    return score if score is not None and JUDGE_SCORE_RANGE[0] <= score <= JUDGE_SCORE_RANGE[1] else None
+
+def judge_totals(prop_scores, opp_scores):
+    # None for both when any speaker has no valid score: a partial total says nothing about who won
+    if not prop_scores or None in prop_scores or None in opp_scores:
+        return None, None
+    return sum(prop_scores), sum(opp_scores)
+
+def parse_judge_response(response, num_turns=3):
+    p_scores_map, o_scores_map, reason = _judge_fields(response)
+    # one entry per speaker position; a missing score stays None instead of shifting later speakers left
+    prop_scores = [valid_judge_score(p_scores_map[i]) for i in range(1, num_turns + 1)]
+    opp_scores = [valid_judge_score(o_scores_map[i]) for i in range(1, num_turns + 1)]
     
-    prop_scores = [p_scores_map[i] for i in range(1, 4) if p_scores_map[i] is not None]
-    opp_scores = [o_scores_map[i] for i in range(1, 4) if o_scores_map[i] is not None]
-    
-    # winner is whoever has higher total
-    p_total = sum(prop_scores) if prop_scores else 0
-    o_total = sum(opp_scores) if opp_scores else 0
+    # winner is whoever has higher total; an incomplete verdict names no winner
+    p_total, o_total = judge_totals(prop_scores, opp_scores)
     
-    if p_total > o_total:
+    if p_total is None:
+        winner = "Invalid"
+    elif p_total > o_total:
         winner = "Proposition"
     elif o_total > p_total:
         winner = "Opposition"
     else:
         winner = "Tie"
     
-    reason = " ".join(reason_lines) if reason_lines else ""
-    
     return prop_scores, opp_scores, winner, reason
 
+@dataclass
+class Judgement:
+    prop_scores: List[int]
+    opp_scores: List[int]
+    winner: str
+    reason: str
+    # per-judge records etc., written to the result row as json
+    details: dict = field(default_factory=dict)
+    # what the deciding judge call returned (a json list of them for a panel), kept for --reparse
+    raw_response: str = ""
+
+def judge_output_format(prompt, options):
+    return prompt + "\n\n" + JUDGE_JSON_FORMAT if options and options.judge_format == "json" else prompt
+
+def judge_debate(motion, turns, judge_lm, tracker=None, judge_lms=None, cascade_lm=None, options=None):
+    options = options or PipelineOptions()
+    judge_prompt = judge_output_format(build_judge_prompt(motion, turns), options)
+    num_turns = sum(1 for turn in turns if turn.team == "Proposition")
+    
+    def strong():
+        if judge_lms:
+            return judge_panel(judge_prompt, judge_lms, tracker=tracker, num_turns=num_turns, repair=options.judge_repair)
+        response = call_judge_checked(judge_lm, judge_prompt, num_turns, tracker=tracker, repair=options.judge_repair)
+        return Judgement(*parse_judge_response(response, num_turns), raw_response=response)
+    
+    if cascade_lm:
+        return judge_cascade(judge_prompt, cascade_lm, strong, options, tracker=tracker, num_turns=num_turns)
+    return strong()
+
+def cascade_audited(judge_prompt, rate):
+    # deterministic per transcript, so a rerun audits the same debates
+    return int(hashlib.sha256(judge_prompt.encode()).hexdigest()[:8], 16) / 0xffffffff < rate
+
+def judge_cascade(judge_prompt, cheap_lm, strong, options, tracker=None, num_turns=3):
+    # the cheap judge's verdict stands when its total-score margin is wide; close calls go to the strong judge
+    response = call_judge_checked(cheap_lm, judge_prompt, num_turns, tracker=tracker, position="judge_cheap",
+                                  repair=options.judge_repair)
+    prop_scores, opp_scores, winner, reason = parse_judge_response(response, num_turns)
+    # a verdict with scores missing has no trustworthy margin and always escalates
+    p_total, o_total = judge_totals(prop_scores, opp_scores)
+    margin = abs(p_total - o_total) if p_total is not None else None
+    decisive = margin is not None and margin > options.cascade_margin
+    audited = decisive and cascade_audited(judge_prompt, options.cascade_audit)
+    details = {"judge_cheap_winner": winner, "judge_cheap_margin": margin, "judge_audited": audited}
+    if decisive and not audited:
+        print(f"    [Cascade] cheap verdict stands: {winner} by {margin:g}")
+        return Judgement(prop_scores, opp_scores, winner, reason, details={**details, "judge_tier": "cheap"},
+                         raw_response=response)
+    
+    judgement = strong()
+    print(f"    [Cascade] {'audited' if audited else 'escalated'} (margin {'-' if margin is None else f'{margin:g}'}): "
+          f"cheap {winner}, strong {judgement.winner}")
+    judgement.details.update({**details, "judge_tier": "strong", "judge_strong_winner": judgement.winner,
+                              "cascade_agreed": winner == judgement.winner})
+    return judgement
+
+def judge_speech(motion, position, team, speaker_number, speech, ledger, judge_lm, tracker=None):
+    # incremental judging: score one speech against the running ledger as soon as it exists
+    response = call_judge(judge_lm, SPEECH_JUDGE_PROMPT.format(motion=motion, ledger=ledger or "(first speech)", team=team,
+                                                               speaker_number=speaker_number, speech=speech),
+                          tracker=tracker, position=f"judge_{position}", stage="judge_speech")
+    score = re.search(r"SCORE:\W*(\d+)", response, re.I)
+    note = re.search(r"NOTE:\s*(.+)", response, re.I)
+    parts = re.split(r"LEDGER:", response, maxsplit=1, flags=re.I)
+    new_ledger = parts[1].strip() if len(parts) == 2 else ""
+    if not new_ledger:
+        # keep the old ledger rather than lose the debate so far
+        if tracker:
+            tracker.note_fallback("ledger")
+        new_ledger = f"{ledger}\n- [{team} Speaker {speaker_number}] (not recorded)".strip()
+    return {"position": position, "team": team, "speaker_number": speaker_number,
+            "score": int(score.group(1)) if score else None, "note": note.group(1).strip() if note else "",
+            "ledger": new_ledger}
+
+def aggregate_judgement(motion, speech_judgements, judge_lm, tracker=None, options=None):
+    # the short closing call of incremental judging: final ledger + provisional scores -> the usual verdict format
+    scores = "\n".join(f"{j['team']} Speaker {j['speaker_number']}: {j['score'] if j['score'] is not None else 'not given'}"
+                       f" - {j['note']}" for j in speech_judgements)
+    score_lines = "\n".join(f"{j['team'].upper()} SPEAKER {j['speaker_number']} SCORE: [score]" for j in speech_judgements)
+    prompt = AGGREGATE_JUDGE_PROMPT.format(motion=motion, ledger=speech_judgements[-1]["ledger"], scores=scores,
+                                           score_lines=score_lines)
+    num_turns = sum(1 for j in speech_judgements if j["team"] == "Proposition")
+    response = call_judge_checked(judge_lm, judge_output_format(prompt, options), num_turns, tracker=tracker,
+                                  repair=options.judge_repair if options else True)
+    return Judgement(*parse_judge_response(response, num_turns),
+                     details={"judge_speech_scores": {j["position"]: j["score"] for j in speech_judgements}},
+                     raw_response=response)
+
+def majority_decided(winners, panel_size):
+    # the leading side wins once the judges still out cannot catch it up, even all voting for the runner-up
+    counts = Counter(w for w in winners if w not in ["Tie", "Invalid"])
+    ranked = counts.most_common(2) + [(None, 0), (None, 0)]
+    (leader, lead), (_, runner_up) = ranked[0], ranked[1]
+    if leader and lead > runner_up + panel_size - len(winners):
+        return leader
+    return None
+
+def judge_panel(judge_prompt, judge_lms, tracker=None, num_turns=3, repair=True):
+    # judge_lms: (model name, lm) per seat; a repeated model is re-sampled without the cache at temperature 1.0
+    votes = []
+    pool = ThreadPoolExecutor(max_workers=len(judge_lms))
+    futures = {}
+    seen = Counter()
+    for seat, (name, lm) in enumerate(judge_lms):
+        call_kwargs = {"cache": False, "temperature": 1.0} if seen[name] else {}
+        seen[name] += 1
+        futures[pool.submit(call_judge_checked, lm, judge_prompt, num_turns, tracker, f"judge_{seat + 1}", repair,
+                            **call_kwargs)] = (seat, name)
+    try:
+        for future in as_completed(futures):
+            seat, name = futures[future]
+            try:
+                response = future.result()
+            except Exception as e:
+                print(f"    [Panel] judge {seat + 1} ({name}) failed: {e}")
+                continue
+            votes.append({"seat": seat + 1, "judge": name, "response": response,
+                          **dict(zip(["prop_scores", "opp_scores", "winner", "reason"],
+                                     parse_judge_response(response, num_turns)))})
+            if majority_decided([v["winner"] for v in votes], len(judge_lms)):
+                break
+    finally:
+        # an http call already sent cannot be recalled: wait for it so its tokens are charged to this debate's
+        # row (and budget) before the row is built, but ignore its verdict
+        pool.shutdown(wait=True, cancel_futures=True)
+    if not votes:
+        raise RuntimeError("every judge on the panel failed")
+    
+    print(f"    [Panel] {len(votes)}/{len(judge_lms)} judges: {', '.join(v['winner'] for v in votes)}")
+    return Judgement(*aggregate_panel(votes, len(judge_lms)),
+                     details={"judge_votes": [{k: v[k] for k in ["seat", "judge", "winner", "prop_scores", "opp_scores"]}
+                                              for v in votes],
+                              "judges_returned": len(votes),
+                              "judges_skipped": len(judge_lms) - len(votes)},
+                     raw_response=json.dumps([v["response"] for v in votes]))
+
+def aggregate_panel(votes, panel_size):
+    # majority winner (Tie without one) and per-speaker mean scores over the judges with a complete verdict
+    valid = [v for v in votes if v["winner"] != "Invalid"]
+    if not valid:
+        num_turns = len(votes[0]["prop_scores"])
+        return [None] * num_turns, [None] * num_turns, "Invalid", votes[0]["reason"]
+    winners = [v["winner"] for v in valid]
+    decided = majority_decided([v["winner"] for v in votes], panel_size)
+    winner = decided or Counter(winners).most_common(1)[0][0]
+    if not decided and winners.count(winner) * 2 <= len(winners):
+        winner = "Tie"
+    
+    def mean_scores(key):
+        return [round(sum(v[key][i] for v in valid) / len(valid), 2) for i in range(len(valid[0][key]))]
+    
+    reason = next((v["reason"] for v in valid if v["winner"] == winner), valid[0]["reason"])
+    return mean_scores("prop_scores"), mean_scores("opp_scores"), winner, reason
+
+
+# speaking order for bp style debate
+FULL_SPEAKING_ORDER = [
+    ("prop_1", "Proposition", 1),
+    ("opp_1", "Opposition", 1),
+    ("prop_2", "Proposition", 2),
+    ("opp_2", "Opposition", 2),
+    ("prop_3", "Proposition", 3),
+    ("opp_3", "Opposition", 3)
+]
+
+class StageNode:
+    # one llm stage of one debate; runs once all of its dependencies have finished
+    def __init__(self, name, fn, deps, model, est_seconds):
+        self.name = name
+        self.fn = fn
+        self.deps = [d for d in deps if d is not None]
+        self.model = model
+        self.est_seconds = est_seconds
+        self.dependents = []
+        self.critical_path = est_seconds
+        self.graph = None
+        self.result = None
+        self.error = None
+        self.done = False
+
+class StageScheduler:
+    # runs the stage nodes of many debates on one thread pool. Ready nodes on the longest remaining
+    # critical path go first, per-model requests-per-minute limits are respected, and only max_active
+    # debates are admitted at a time so debates finish instead of all progressing together.
+    # The limits live in RATE_LIMITER, which charges each llm call; the scheduler only holds back nodes
+    # whose model has no room left so they don't tie up a pool thread waiting.
+    def __init__(self, max_in_flight=32):
+        self.max_in_flight = max_in_flight
+        self.sequence = 0
+
+    def _rate_ok(self, model):
+        return RATE_LIMITER.available(model)
+
+    def run(self, graphs, max_active=1):
+        graphs = iter(graphs)
+        active = set()
+        waiting = {}
+        ready = []
+        completions = queue.Queue()
+        in_flight = 0
+        
+        def admit():
+            while len(active) < max_active:
+                graph = next(graphs, None)
+                if graph is None:
+                    return
+                active.add(graph)
+                graph.pending = len(graph.nodes)
+                # a node can depend on a node of an earlier debate (shared prefix) that may already be done
+                for node in graph.nodes:
+                    waiting[node] = sum(1 for d in node.deps if not d.done)
+                for node in graph.nodes:
+                    if node.done:
+                        continue
+                    failed = next((d for d in node.deps if d.done and d.error), None)
+                    if failed:
+                        node.error = failed.error
+                        finish(node)
+                    elif waiting[node] == 0:
+                        push(node)
+        
+        def push(node):
+            self.sequence += 1
+            heapq.heappush(ready, (-node.critical_path, node.graph.index, self.sequence, node))
+        
+        def finish(node):
+            node.done = True
+            for dependent in node.dependents:
+                # dependents of debates that are not admitted yet check their inputs when they are
+                if dependent.done or dependent not in waiting:
+                    continue
+                if node.error:
+                    # nothing downstream of a failed stage can run
+                    dependent.error = node.error
+                    finish(dependent)
+                else:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        push(dependent)
+            graph = node.graph
+            graph.pending -= 1
+            if graph.pending == 0:
+                active.discard(graph)
+                graph.finished()
+        
+        def execute(node):
+            try:
+                node.result = node.fn()
+            except Exception as e:
+                node.error = e
+            completions.put(node)
+        
+        admit()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            while active:
+                throttled = []
+                while ready and in_flight < self.max_in_flight:
+                    entry = heapq.heappop(ready)
+                    node = entry[3]
+                    if node.done:
+                        continue
+                    if not self._rate_ok(node.model):
+                        throttled.append(entry)
+                        continue
+                    in_flight += 1
+                    executor.submit(execute, node)
+                for entry in throttled:
+                    heapq.heappush(ready, entry)
+                if in_flight == 0 and not ready:
+                    # only possible if a graph has a dependency cycle
+                    raise RuntimeError("Stage scheduler stalled with unfinished debates")
+                try:
+                    node = completions.get(timeout=1.0 if throttled else None)
+                except queue.Empty:
+                    continue
+                in_flight -= 1
+                finish(node)
+                admit()
+
+class DebateGraph:
+    # one debate broken into stage nodes: per speaker extract -> refute, case, synthesize (or a single
+    # speech node for baseline/detailed_prompts), then the judge over every speech
+    def __init__(self, index, motion, prop_architecture, opp_architecture, prop_model_name, opp_model_name,
+                 judge_model_name, prop_lm, opp_lm, judge_lm, num_turns=3, tracker=None, options=None,
+                 stage_lms=None, on_finished=None, prefix_cache=None, prefix_keys=None, variant=None, judge_lms=None,
+                 cascade_lm=None):
+        self.index = index
+        self.motion = motion
+        self.prop_architecture = prop_architecture
+        self.opp_architecture = opp_architecture
+        self.prop_model_name = prop_model_name
+        self.opp_model_name = opp_model_name
+        self.judge_model_name = judge_model_name
+        self.judge_lm = judge_lm
+        self.tracker = tracker
+        self.options = options or PipelineOptions()
+        self.on_finished = on_finished
+        self.speaking_order = FULL_SPEAKING_ORDER[:num_turns * 2]
+        self.speeches = {}
+        self.judgement = None
+        self.started = time.time()
+        self.nodes = []
+        self.case_nodes = {}
+        # (speech position, model) -> per-speech extraction node, shared by every later speaker
+        self.speech_extract_nodes = {}
+        # first speaker position -> its brainstormed fragments node (the team's fragment pool)
+        self.fragment_nodes = {}
+        self.variant = variant
+        self.shared_speeches = 0
+        
+        speech_nodes = {}
+        previous_node = None
+        for i, (position, team, speaker_num) in enumerate(self.speaking_order):
+            arch = prop_architecture if team == "Proposition" else opp_architecture
+            lm = prop_lm if team == "Proposition" else opp_lm
+            speaker = DebateSpeaker(lm, position, arch, tracker=tracker, options=self.options, stage_lms=stage_lms,
+                                    variant=variant)
+            prefix_key = prefix_keys[i] if prefix_cache is not None else None
+            if prefix_key in (prefix_cache or {}):
+                # an earlier debate already produces this speech from identical inputs; its case and fragments
+                # come along, so a 2nd speaker here reuses them as it would in the owner debate
+                shared, shared_case, shared_fragments = prefix_cache[prefix_key]
+                if shared_case:
+                    self.case_nodes[position] = shared_case
+                if shared_fragments:
+                    self.fragment_nodes[position] = shared_fragments
+                node = self._node(position, "shared", speaker, lambda n=shared: n.result, [shared])
+                self.shared_speeches += 1
+                speech_nodes[position] = node
+                previous_node = node
+                continue
+            earlier = [p for p, _, _ in self.speaking_order[:self.speaking_order.index((position, team, speaker_num))]]
+            teammate_position = next((p for p in reversed(earlier) if p.startswith(position.split("_")[0])), None)
+            opponent_positions = [p for p in earlier if not p.startswith(position.split("_")[0])]
+            # without speculation every speaker waits for the previous speech, as in a live debate
+            gate = None if self.options.speculative else previous_node
+            
+            if not speaker.is_multistage():
+                node = self._node(position, "speech", speaker,
+                                  lambda s=speaker, t=teammate_position, o=opponent_positions:
+                                      s.generate_speech(motion, self.speeches.get(t), [self.speeches[p] for p in o]),
+                                  [speech_nodes[p] for p in earlier] + [gate])
+            else:
+                fused = self.options.rebuttal_mode == "fused"
+                if speaker.has_rebuttal() and not fused and self.options.extraction_mode == "incremental":
+                    idea_nodes = [self._speech_extract_node(speaker, p, speech_nodes[p]) for p in opponent_positions]
+                    extract_node = self._node(position, "bucket", speaker,
+                                              lambda s=speaker, n=idea_nodes:
+                                                  s.bucket_ideas(merge_ranked_ideas([i.result for i in n])),
+                                              idea_nodes + [gate])
+                elif speaker.has_rebuttal() and not fused:
+                    extract_node = self._node(position, "extract", speaker,
+                                              lambda s=speaker, o=opponent_positions:
+                                                  s.extract_threats([self.speeches[p] for p in o]),
+                                              [speech_nodes[p] for p in opponent_positions] + [gate])
+                refute_nodes = []
+                if speaker.has_rebuttal() and fused:
+                    refute_nodes = [self._node(position, "rebut", speaker,
+                                               lambda s=speaker, o=opponent_positions:
+                                                   s.fused_rebuttal([self.speeches[p] for p in o]),
+                                               [speech_nodes[p] for p in opponent_positions] + [gate])]
+                elif speaker.has_rebuttal() and self.options.refute_mode == "per_bucket":
+                    refute_nodes = [self._node(position, "refute", speaker,
+                                               lambda s=speaker, n=extract_node, i=i: s.refute_bucket(n.result, i),
+                                               [extract_node])
+                                    for i in range(speaker.num_buckets())]
+                elif speaker.has_rebuttal():
+                    refute_nodes = [self._node(position, "refute", speaker,
+                                               lambda s=speaker, n=extract_node: s.refute_threats(n.result),
+                                               [extract_node])]
+                case_node = None
+                if speaker.has_independent_case():
+                    first_position = f"{position.split('_')[0]}_1"
+                    if (arch == "schema_guided" and speaker_num == 2 and self.options.speculative
+                            and first_position in self.case_nodes):
+                        # same motion, model and prompts as the first speaker; run sequentially these were dspy cache hits anyway
+                        case_node = self.case_nodes[first_position]
+                    elif speaker.uses_split_generation() and self.options.fragment_pool and first_position in self.fragment_nodes:
+                        pool_node = self.fragment_nodes[first_position]
+                        case_node = self._node(position, "cluster", speaker,
+                                               lambda s=speaker, f=pool_node, t=teammate_position:
+                                                   s.draw_from_pool(motion, f.result, self.speeches.get(t)),
+                                               [pool_node, speech_nodes.get(teammate_position), gate])
+                    elif speaker.uses_split_generation():
+                        fragments_node = self._node(position, "generate", speaker,
+                                                    lambda s=speaker: s.brainstorm_fragments(motion), [gate])
+                        self.fragment_nodes[position] = fragments_node
+                        case_node = self._node(position, "cluster", speaker,
+                                               lambda s=speaker, f=fragments_node, t=teammate_position:
+                                                   s.cluster_case(motion, f.result, self.speeches.get(t)),
+                                               [fragments_node, speech_nodes.get(teammate_position), gate])
+                    else:
+                        needs_teammate = speaker.case_needs_teammate()
+                        case_node = self._node(position, "generate" if arch == "enhanced" else "slot_fill", speaker,
+                                               lambda s=speaker, t=teammate_position, n=needs_teammate:
+                                                   s.prepare_case(motion, self.speeches.get(t) if n else None),
+                                               [speech_nodes.get(teammate_position) if needs_teammate else None, gate])
+                    self.case_nodes[position] = case_node
+                if self.options.synthesis_mode == "sections":
+                    outline_node = self._node(position, "outline", speaker,
+                                              lambda s=speaker, r=refute_nodes, c=case_node:
+                                                  s.outline_speech(motion, merge_refutations([n.result for n in r]),
+                                                                   c.result if c else ""),
+                                              refute_nodes + [case_node, gate])
+                    section_nodes = [self._node(position, "section", speaker,
+                                                lambda s=speaker, o=outline_node, c=case_node, i=i:
+                                                    s.write_section(motion, o.result, c.result if c else "", i),
+                                                [outline_node])
+                                     for i in range(len(speaker.section_plan()))]
+                    node = self._node(position, "stitch", speaker,
+                                      lambda s=speaker, n=section_nodes: s.stitch_sections([x.result for x in n]),
+                                      section_nodes)
+                else:
+                    node = self._node(position, "synthesize", speaker,
+                                      lambda s=speaker, r=refute_nodes, c=case_node:
+                                          s.synthesize(motion, merge_refutations([n.result for n in r]), c.result if c else ""),
+                                      refute_nodes + [case_node, gate])
+            if prefix_key:
+                prefix_cache[prefix_key] = (node, self.case_nodes.get(position), self.fragment_nodes.get(position))
+            speech_nodes[position] = node
+            previous_node = node
+        
+        if self.options.judge_mode == "incremental":
+            # each speech is judged while the next ones are being written; the ledger chains them in speaking order
+            ledger_nodes = []
+            for position, team, speaker_num in self.speaking_order:
+                previous = ledger_nodes[-1] if ledger_nodes else None
+                ledger_nodes.append(self._node(position, "judge_speech", None,
+                                               lambda p=position, t=team, n=speaker_num, prev=previous:
+                                                   judge_speech(motion, p, t, n, self.speeches[p],
+                                                                prev.result["ledger"] if prev else "", judge_lm,
+                                                                tracker=tracker),
+                                               [speech_nodes[position], previous]))
+            self.judge_node = self._node("judge", "judge", None,
+                                         lambda: aggregate_judgement(motion, [n.result for n in ledger_nodes], judge_lm,
+                                                                     tracker=tracker, options=self.options),
+                                         ledger_nodes)
+        else:
+            self.judge_node = self._node("judge", "judge", None,
+                                         lambda: judge_debate(motion, self.turns(), judge_lm, tracker=tracker,
+                                                              judge_lms=judge_lms, cascade_lm=cascade_lm,
+                                                              options=self.options),
+                                         list(speech_nodes.values()))
+        self._compute_critical_paths()
+
+    def _speech_extract_node(self, speaker, speech_position, speech_node):
+        # runs as soon as the speech exists, once per extraction model
+        key = (speech_position, model_id(speaker.stage_lms.get("extract", speaker.lm)))
+        if key not in self.speech_extract_nodes:
+            self.speech_extract_nodes[key] = self._node(speaker.speaker_position, "extract", speaker,
+                                                        lambda s=speaker: s.extract_speech_ideas(self.speeches[speech_position]),
+                                                        [speech_node])
+        return self.speech_extract_nodes[key]
+
+    def _node(self, position, stage, speaker, fn, deps):
+        if speaker:
+            lm = speaker.stage_lms.get(stage, speaker.lm)
+        else:
+            lm = self.judge_lm
+        model = model_id(lm)
+        est_seconds = 0.0 if stage in ["shared", "stitch"] else estimate_latency(model, DEFAULT_STAGE_OUTPUT_TOKENS.get(stage, 1500))
+        
+        def run():
+            result = fn()
+            if stage in ["speech", "synthesize", "shared", "stitch"]:
+                self.speeches[position] = result
+                print(f"  {speaker.team} Speaker {speaker.speaker_number} spoke.")
+            return result
+        
+        node = StageNode(f"{self.index}:{position}:{stage}", run, deps, model, est_seconds)
+        node.graph = self
+        for dep in node.deps:
+            dep.dependents.append(node)
+        self.nodes.append(node)
+        return node
+
+    def _compute_critical_paths(self):
+        # nodes are created in dependency order, so one reverse pass gives the longest path to the judge
+        for node in reversed(self.nodes):
+            node.critical_path = node.est_seconds + max((d.critical_path for d in node.dependents), default=0.0)
+
+    @property
+    def error(self):
+        return next((node.error for node in self.nodes if node.error), None)
+
+    def turns(self):
+        turns = []
+        for position, team, speaker_num in self.speaking_order:
+            arch = self.prop_architecture if team == "Proposition" else self.opp_architecture
+            turns.append(Turn(position, team, speaker_num, self.speeches[position], arch))
+        return turns
+
+    def finished(self):
+        if self.on_finished:
+            self.on_finished(self)
+
+    def result(self):
+        judgement = self.judge_node.result
+        print(f"  Winner: {judgement.winner}\n")
+        return DebateResult(
+            motion=self.motion,
+            prop_model=self.prop_model_name,
+            opp_model=self.opp_model_name,
+            judge_model=self.judge_model_name,
+            prop_architecture=self.prop_architecture,
+            opp_architecture=self.opp_architecture,
+            turns=self.turns(),
+            prop_scores=judgement.prop_scores,
+            opp_scores=judgement.opp_scores,
+            winner=judgement.winner,
+            reason_for_decision=judgement.reason,
+            usage={**(self.tracker.summary() if self.tracker else {}),
+                   "wall_seconds": round(time.time() - self.started, 1),
+                   "shared_speeches": self.shared_speeches,
+                   "prefix_variant": self.variant},
+            options=asdict(self.options),
+            judge_details={**judgement.details, "judge_raw_response": judgement.raw_response}
+        )
+
+def speech_prefix_keys(job, variant=0):
+    # speech i has the same inputs in two debates when the motion, the pipeline options and every
+    # speaker's (position, architecture, model) up to and including i match
+    options = asdict(options_from_job(job))
+    options.pop("speculative")
+    keys = []
+    prefix = [job["motion"], variant, json.dumps(options, sort_keys=True)]
+    for position, team, _ in FULL_SPEAKING_ORDER[:job["turns"] * 2]:
+        side = "prop" if team == "Proposition" else "opp"
+        prefix.append((position, job[f"{side}_arch"], MODEL_MAP.get(job[f"{side}_model"], job[f"{side}_model"])))
+        keys.append(hashlib.sha256(json.dumps(prefix).encode("utf-8")).hexdigest())
+    return keys
+
+def assign_prefix_variants(jobs, samples=1):
+    # debates that open the same way are dealt round-robin into `samples` groups; sharing happens within a group
+    seen = {}
+    variants = []
+    for job in jobs:
+        root = speech_prefix_keys(job)[0]
+        variants.append(seen.get(root, 0) % max(1, samples))
+        seen[root] = seen.get(root, 0) + 1
+    return variants
 
 def run_crossover_debate(motion, 
                         prop_architecture,
@@ -559,78 +2408,928 @@ def run_crossover_debate(motion,
                         prop_lm, 
                         opp_lm, 
                         judge_lm,
-                        num_turns=3):
+                        num_turns=3,
+                        tracker=None,
+                        options=None,
+                        stage_lms=None,
+                        scheduler=None,
+                        judge_lms=None,
+                        cascade_lm=None):
     
     print(f"\n=== Running Crossover Debate ({num_turns}v{num_turns}) ===")
     print(f"Motion: {motion}")
     print(f"Proposition: {prop_model_name} ({prop_architecture} architecture)")
     print(f"Opposition: {opp_model_name} ({opp_architecture} architecture)")
-    print(f"Judge: {judge_model_name}\n")
+    print(f"Judge: {judge_model_name}\n" if not judge_lms else f"Judge panel: {', '.join(n for n, _ in judge_lms)}\n")
+    
+    graph = DebateGraph(0, motion, prop_architecture, opp_architecture, prop_model_name, opp_model_name,
+                        judge_model_name, prop_lm, opp_lm, judge_lm, num_turns=num_turns, tracker=tracker,
+                        options=options, stage_lms=stage_lms, judge_lms=judge_lms, cascade_lm=cascade_lm)
+    (scheduler or StageScheduler(max_in_flight=8)).run([graph])
+    if graph.error:
+        raise graph.error
+    return graph.result()
+
+# map short names to full openai model names
+MODEL_MAP = {
+    '4o': 'gpt-4o',
+    '4o-mini': 'gpt-4o-mini',
+    'o1': 'o1',
+    'o1-mini': 'o1-mini',
+    'o3': 'o3'
+}
+
+# lm objects are built once per process and reused (keeps http clients warm in the worker)
+_LM_CACHE = {}
+_LM_CACHE_LOCK = threading.Lock()
+
+class Deployment:
+    # one concrete endpoint (provider model + key/base) behind a logical model, with health tracking
+    def __init__(self, spec, num_retries=1):
+        self.name = spec.get("name") or spec["model"]
+        kwargs = {k: v for k, v in spec.items() if k not in ["name", "model", "api_key_env"]}
+        if spec.get("api_key_env"):
+            kwargs["api_key"] = os.getenv(spec["api_key_env"])
+        self.lm = dspy.LM(spec["model"], num_retries=num_retries, **kwargs)
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None
+        self.open_until = 0.0
+
+    def available(self, now):
+        # circuit is open until the cooldown passes; after that one trial call is let through
+        return now >= self.open_until
+
+    def record_success(self, latency):
+        self.calls += 1
+        self.consecutive_failures = 0
+        self.latency = latency if self.latency is None else 0.8 * self.latency + 0.2 * latency
+
+    def record_failure(self, failure_threshold, cooldown):
+        self.calls += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= failure_threshold:
+            self.open_until = time.time() + cooldown
+
+class PooledLM:
+    # drop-in for dspy.LM: picks a healthy deployment per call and fails over to the next one
+    def __init__(self, name, deployments, policy="least_latency", failure_threshold=3, cooldown=60.0):
+        self.name = name
+        self.model = f"pool/{MODEL_MAP.get(name, name)}"
+        self.deployments = deployments
+        self.policy = policy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.lock = threading.Lock()
+        self.next_index = 0
+
+    def _candidates(self):
+        now = time.time()
+        with self.lock:
+            healthy = [d for d in self.deployments if d.available(now)]
+            if not healthy:
+                # everything is tripped: try the one that recovers first rather than failing outright
+                healthy = [min(self.deployments, key=lambda d: d.open_until)]
+            if self.policy == "round_robin":
+                start = self.next_index % len(healthy)
+                self.next_index += 1
+                return healthy[start:] + healthy[:start]
+            # untried deployments first, then fastest by moving average
+            return sorted(healthy, key=lambda d: -1.0 if d.latency is None else d.latency)
+
+    def __call__(self, prompt=None, **kwargs):
+        last_error = None
+        for deployment in self._candidates():
+            started = time.time()
+            try:
+                response = deployment.lm(prompt=prompt, **kwargs)
+            except Exception as e:
+                with self.lock:
+                    deployment.record_failure(self.failure_threshold, self.cooldown)
+                print(f"    [LM Pool] {self.name}: {deployment.name} failed ({e!r}), failing over")
+                last_error = e
+                continue
+            with self.lock:
+                deployment.record_success(time.time() - started)
+            return response
+        raise last_error
+
+    def status(self):
+        now = time.time()
+        with self.lock:
+            return [{"deployment": d.name, "calls": d.calls, "failures": d.failures,
+                     "latency": None if d.latency is None else round(d.latency, 2),
+                     "state": "open" if not d.available(now) else "closed"} for d in self.deployments]
+
+class LMRegistry:
+    # logical model name -> pool of deployments, loaded from a json config (see lm_registry.example.json)
+    def __init__(self, config):
+        self.pools = {}
+        defaults = {k: config[k] for k in ["policy", "failure_threshold", "cooldown"] if k in config}
+        self._configure_http_pool(config.get("http_pool"))
+        for name, price in config.get("prices", {}).items():
+            MODEL_PRICES[name] = tuple(price)
+        for name, specs in config.get("models", {}).items():
+            deployments = [Deployment(spec, num_retries=config.get("num_retries", 1)) for spec in specs]
+            self.pools[name] = PooledLM(name, deployments, **defaults)
+
+    @staticmethod
+    def _configure_http_pool(http_pool):
+        # one shared keep-alive client for every litellm call in the process
+        if not http_pool:
+            return
+        try:
+            import httpx
+            import litellm
+        except ImportError:
+            print("Warning: httpx/litellm not importable, keeping default HTTP clients.")
+            return
+        litellm.client_session = httpx.Client(
+            limits=httpx.Limits(max_connections=http_pool.get("max_connections", 100),
+                                max_keepalive_connections=http_pool.get("max_keepalive", 20)),
+            timeout=http_pool.get("timeout", 600))
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def get(self, model_name):
+        return self.pools.get(model_name) or self.pools.get(MODEL_MAP.get(model_name, model_name))
+
+    def print_status(self):
+        print("\n=== LM Pool Status ===")
+        for name, pool in self.pools.items():
+            for d in pool.status():
+                print(f"  {name:<14}{d['deployment']:<40}{d['calls']:>6} calls {d['failures']:>4} failed  "
+                      f"{d['latency'] or '-':>6}s  {d['state']}")
+
+LM_REGISTRY = None
+
+def get_lm(model_name, api_key):
+    if LM_REGISTRY and LM_REGISTRY.get(model_name):
+        return LM_REGISTRY.get(model_name)
+    model_full = MODEL_MAP.get(model_name, model_name)
+    with _LM_CACHE_LOCK:
+        if model_full not in _LM_CACHE:
+            print(f"DEBUG: building LM for {model_full}")
+            _LM_CACHE[model_full] = dspy.LM(f'openai/{model_full}', api_key=api_key)
+        return _LM_CACHE[model_full]
+
+def result_to_row(result, num_turns):
+    row = {
+        "motion": result.motion,
+        "num_turns": num_turns,
+        "prop_model": result.prop_model,
+        "opp_model": result.opp_model,
+        "judge_model": result.judge_model,
+        "prop_architecture": result.prop_architecture,
+        "opp_architecture": result.opp_architecture,
+        "winner": result.winner,
+        "reason_for_decision": result.reason_for_decision,
+    }
+    row["prop_total_score"], row["opp_total_score"] = judge_totals(result.prop_scores, result.opp_scores)
     
-    turns = []
-    prop_speeches = []
-    opp_speeches = []
+    for i in range(3):
+        row[f"prop_{i+1}_score"] = result.prop_scores[i] if i < len(result.prop_scores) else None
+        row[f"opp_{i+1}_score"] = result.opp_scores[i] if i < len(result.opp_scores) else None
     
-    # speaking order for bp style debate
-    full_speaking_order = [
-        ("prop_1", "Proposition", 1),
-        ("opp_1", "Opposition", 1),
-        ("prop_2", "Proposition", 2),
-        ("opp_2", "Opposition", 2),
-        ("prop_3", "Proposition", 3),
-        ("opp_3", "Opposition", 3)
-    ]
+    for speaker_num in range(1, 4):
+        row[f"prop_{speaker_num}_speech"] = None
+        row[f"opp_{speaker_num}_speech"] = None
     
-    speaking_order = full_speaking_order[:num_turns * 2]
+    for turn in result.turns:
+        team_prefix = "prop" if turn.team.lower() == "proposition" else "opp"
+        row[f"{team_prefix}_{turn.speaker_number}_speech"] = turn.speech
     
-    for position, team, speaker_num in speaking_order:
-        arch = prop_architecture if team == "Proposition" else opp_architecture
-        lm = prop_lm if team == "Proposition" else opp_lm
-        
-        speaker = DebateSpeaker(lm, position, arch)
-        
-        teammate_speech = None
-        opponent_speeches = []
+    row.update({k: json.dumps(v, sort_keys=True) if isinstance(v, (dict, list)) else v for k, v in result.options.items()})
+    row.update(result.usage)
+    row.update({k: json.dumps(v) if isinstance(v, (dict, list)) else v for k, v in result.judge_details.items()})
+    return row
+
+_CSV_LOCK = threading.Lock()
+
+def append_rows_to_csv(rows, output):
+    df = pd.DataFrame(rows)
+    with _CSV_LOCK:
+        # append or create csv
+        if os.path.exists(output):
+            existing_df = pd.read_csv(output)
+            df = pd.concat([existing_df, df], ignore_index=True)
+        df.to_csv(output, index=False)
+
+def admit_debate(job, study_budget):
+    # governor: stop starting debates once the study budget cannot cover another one
+    if not study_budget:
+        return
+    projected = sum(call["cost"] for call in plan_debate(job))
+    if study_budget.remaining() < projected:
+        raise BudgetExceeded(f"study budget has ${max(0.0, study_budget.remaining()):.2f} left, "
+                             f"debate needs ~${projected:.2f}")
+
+def job_debate_kwargs(job, api_key, study_budget=None):
+    # turns a job dict into the arguments of run_crossover_debate / DebateGraph
+    options = options_from_job(job)
+    return dict(
+        motion=job["motion"],
+        prop_architecture=job["prop_arch"],
+        opp_architecture=job["opp_arch"],
+        prop_model_name=MODEL_MAP.get(job["prop_model"], job["prop_model"]),
+        opp_model_name=MODEL_MAP.get(job["opp_model"], job["opp_model"]),
+        judge_model_name=MODEL_MAP.get(job["judge_model"], job["judge_model"]),
+        prop_lm=get_lm(job["prop_model"], api_key),
+        opp_lm=get_lm(job["opp_model"], api_key),
+        judge_lm=get_lm(job["judge_model"], api_key),
+        num_turns=job["turns"],
+        tracker=UsageTracker(
+            debate_id=job.get("id"),
+            log_path=job.get("call_log"),
+            budgets=[TokenBudget(job["debate_budget"], "debate budget") if job.get("debate_budget") else None,
+                     study_budget],
+            policy=job.get("budget_policy") or "truncate"
+        ),
+        options=options,
+        stage_lms={stage: get_lm(model, api_key) for stage, model in options.stage_models.items()},
+        judge_lms=[(MODEL_MAP.get(m, m), get_lm(m, api_key)) for m in options.judge_panel],
+        cascade_lm=get_lm(options.judge_cascade, api_key) if options.judge_cascade else None
+    )
+
+def run_job(job, api_key, study_budget=None):
+    # a job is a plain dict with the same fields as the cli arguments
+    admit_debate(job, study_budget)
+    result = run_crossover_debate(**job_debate_kwargs(job, api_key, study_budget))
+    return result, result_to_row(result, job["turns"])
+
+def _write_json_atomic(path, data):
+    # unique temp name: two debates can store the same artifact at once
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+def _spool_dirs(spool_dir):
+    dirs = {name: os.path.join(spool_dir, name) for name in ["pending", "running", "done", "failed"]}
+    for d in dirs.values():
+        os.makedirs(d, exist_ok=True)
+    return dirs
+
+# a worker touches its running/ files every poll; one untouched this long belongs to a worker that died
+STALE_JOB_SECONDS = 120
+
+def requeue_stale_jobs(dirs, stale_after):
+    now = time.time()
+    for name in os.listdir(dirs["running"]):
+        path = os.path.join(dirs["running"], name)
+        try:
+            idle = now - os.path.getmtime(path)
+            if idle > stale_after:
+                os.replace(path, os.path.join(dirs["pending"], name))
+                print(f"[worker] re-queued {name} (no heartbeat for {idle:.0f}s)")
+        except FileNotFoundError:
+            # finished or claimed by another worker in the meantime
+            continue
+
+def serve_worker(spool_dir, api_key, num_workers=4, poll_interval=1.0, study_budget=None, stale_after=STALE_JOB_SECONDS):
+    # long running worker: lms, http pools and the logic store stay loaded between debates
+    dirs = _spool_dirs(spool_dir)
+    stale_after = max(stale_after, 10 * poll_interval)
+    
+    def process(job_file):
+        job_id = os.path.splitext(os.path.basename(job_file))[0]
+        job = None
+        started = time.time()
+        try:
+            with open(job_file) as f:
+                job = json.load(f)
+            job_id = job["id"]
+            result, row = run_job(job, api_key, study_budget=study_budget)
+            if job.get("output"):
+                append_rows_to_csv([row], job["output"])
+            _write_json_atomic(os.path.join(dirs["done"], f"{job_id}.json"),
+                               {"job": job, "row": row, "seconds": time.time() - started})
+            print(f"[worker] {job_id} done: {result.winner}")
+        except Exception as e:
+            _write_json_atomic(os.path.join(dirs["failed"], f"{job_id}.json"),
+                               {"job": job, "error": repr(e), "seconds": time.time() - started})
+            print(f"[worker] {job_id} failed: {e!r}")
+        finally:
+            try:
+                os.remove(job_file)
+            except FileNotFoundError:
+                pass
+    
+    print(f"=== Debate worker listening on {spool_dir} ({num_workers} slots) ===")
+    in_flight = {}
+    executor = ThreadPoolExecutor(max_workers=num_workers)
+    try:
+        while True:
+            in_flight = {f: path for f, path in in_flight.items() if not f.done()}
+            # heartbeat: other workers sharing the spool leave these alone
+            for path in in_flight.values():
+                try:
+                    os.utime(path)
+                except FileNotFoundError:
+                    pass
+            # only jobs nobody has touched for stale_after seconds (their worker died) go back to pending/
+            requeue_stale_jobs(dirs, stale_after)
+            pending = sorted(os.listdir(dirs["pending"]))
+            for name in pending:
+                if len(in_flight) >= num_workers:
+                    break
+                if not name.endswith(".json"):
+                    continue
+                running_file = os.path.join(dirs["running"], name)
+                try:
+                    # touch first: a rename keeps the submit time, which would look stale to the other workers
+                    os.utime(os.path.join(dirs["pending"], name))
+                    # claiming by rename is atomic, so several workers can share a spool
+                    os.replace(os.path.join(dirs["pending"], name), running_file)
+                except FileNotFoundError:
+                    continue
+                in_flight[executor.submit(process, running_file)] = running_file
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print("\n[worker] shutting down, waiting for running debates...")
+    finally:
+        executor.shutdown(wait=True)
+
+def submit_jobs(spool_dir, jobs, wait=True, poll_interval=1.0):
+    dirs = _spool_dirs(spool_dir)
+    
+    job_ids = []
+    for job in jobs:
+        job = dict(job)
+        job["id"] = job.get("id") or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        if job.get("output"):
+            job["output"] = os.path.abspath(job["output"])
+        _write_json_atomic(os.path.join(dirs["pending"], f"{job['id']}.json"), job)
+        job_ids.append(job["id"])
+        print(f"Submitted {job['id']}: {job['prop_arch']} ({job['prop_model']}) vs {job['opp_arch']} ({job['opp_model']})")
+    
+    if not wait:
+        return []
+    
+    # stream results back as the worker finishes them
+    results = []
+    remaining = set(job_ids)
+    while remaining:
+        for job_id in sorted(remaining):
+            for status in ["done", "failed"]:
+                path = os.path.join(dirs[status], f"{job_id}.json")
+                if os.path.exists(path):
+                    with open(path) as f:
+                        record = json.load(f)
+                    remaining.discard(job_id)
+                    results.append(record)
+                    if status == "done":
+                        row = record["row"]
+                        print(f"[{job_id}] Winner: {row['winner']} "
+                              f"(Prop {row['prop_total_score']} - Opp {row['opp_total_score']}, {record['seconds']:.0f}s)")
+                    else:
+                        print(f"[{job_id}] FAILED: {record['error']}")
+        if remaining:
+            time.sleep(poll_interval)
+    return results
+
+def load_jobs_file(path, defaults):
+    jobs = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                job = dict(defaults)
+                job.update(json.loads(line))
+                jobs.append(job)
+    return jobs
+
+def load_plan_history(call_log_paths=None, result_csv_patterns=None):
+    history = {"stage_output": {}, "speech_tokens": {}, "speed": {}}
+    
+    # call logs give average output per stage and observed speed per model
+    calls = []
+    for path in call_log_paths or []:
+        if os.path.exists(path):
+            with open(path) as f:
+                calls.extend(json.loads(line) for line in f if line.strip())
+    by_stage = {}
+    by_model = {}
+    for call in calls:
+        by_stage.setdefault(call["stage"], []).append(call["output_tokens"])
+        out_tokens, seconds = by_model.get(call["model"], (0, 0.0))
+        by_model[call["model"]] = (out_tokens + call["output_tokens"], seconds + call["latency"])
+    history["stage_output_p95"] = {}
+    for stage, outputs in by_stage.items():
+        history["stage_output"][stage] = int(sum(outputs) / len(outputs))
+        if len(outputs) >= 10:
+            history["stage_output_p95"][stage] = sorted(outputs)[int(0.95 * (len(outputs) - 1))]
+    for model, (out_tokens, seconds) in by_model.items():
+        if seconds > 0 and out_tokens > 0:
+            history["speed"][model] = (out_tokens / seconds, 0.0)
+    
+    # past result csvs give average speech length per architecture
+    speech_lengths = {}
+    for pattern in result_csv_patterns or []:
+        for path in glob.glob(pattern, recursive=True):
+            try:
+                df = pd.read_csv(path)
+            except Exception:
+                continue
+            for side in ["prop", "opp"]:
+                arch_col = f"{side}_architecture"
+                if arch_col not in df.columns:
+                    continue
+                for n in range(1, 4):
+                    speech_col = f"{side}_{n}_speech"
+                    if speech_col not in df.columns:
+                        continue
+                    for arch, speech in zip(df[arch_col], df[speech_col]):
+                        if isinstance(speech, str) and speech.strip():
+                            speech_lengths.setdefault(arch, []).append(estimate_tokens(speech))
+    for arch, lengths in speech_lengths.items():
+        history["speech_tokens"][arch] = int(sum(lengths) / len(lengths))
+    
+    return history
+
+def _schemas_per_speaker():
+    # number of slot fills depends on the parsed domain; every domain currently has the same count
+    counts = {len(entry["mechanisms"]) for entry in LOGIC_STORE} or {0}
+    return max(counts), len(counts) == 1
+
+def estimate_latency(model, output_tokens, history=None):
+    speed = (history or {}).get("speed", {}).get(model) or MODEL_SPEED.get(model, (60, 2.0))
+    tokens_per_sec, overhead = speed
+    generated = output_tokens * (1 + REASONING_MODELS.get(model, 0.0))
+    return overhead + generated / tokens_per_sec
+
+def plan_debate(job, history=None):
+    # walk the speaking order exactly like run_crossover_debate, but only count tokens
+    history = history or {}
+    stage_output = dict(DEFAULT_STAGE_OUTPUT_TOKENS)
+    stage_output.update(history.get("stage_output", {}))
+    speech_tokens = history.get("speech_tokens", {})
+    num_schemas, _ = _schemas_per_speaker()
+    motion_tokens = estimate_tokens(job["motion"])
+    options = options_from_job(job)
+    digested = set()
+    extracted = set()
+    case_filled = set()
+    
+    calls = []
+    def add(position, stage, model, input_tokens, output_tokens):
+        if stage in options.stage_models:
+            model = MODEL_MAP.get(options.stage_models[stage], options.stage_models[stage])
+        budget = options.output_budgets.get(f"{stage}:{position}") or options.output_budgets.get(stage)
+        if budget and model not in REASONING_MODELS:
+            output_tokens = min(output_tokens, int(budget * options.cap_margin))
+        calls.append({
+            "position": position,
+            "stage": stage,
+            "model": model,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "cost": estimate_cost(model, input_tokens, output_tokens),
+            "latency": estimate_latency(model, output_tokens, history)
+        })
+    
+    spoken = {"Proposition": [], "Opposition": []}
+    for position, team, speaker_num in FULL_SPEAKING_ORDER[:job["turns"] * 2]:
+        arch = job["prop_arch"] if team == "Proposition" else job["opp_arch"]
+        model_name = job["prop_model"] if team == "Proposition" else job["opp_model"]
+        model = MODEL_MAP.get(model_name, model_name)
+        teammate = spoken[team][-1] if spoken[team] else 0
+        opponent_team = "Opposition" if team == "Proposition" else "Proposition"
+        opponents = spoken[opponent_team]
         
-        if team == "Proposition":
-            if prop_speeches:
-                teammate_speech = prop_speeches[-1]
-            opponent_speeches = opp_speeches
+        if arch in ["baseline", "detailed_prompts"]:
+            prompts = BASELINE_PROMPTS if arch == "baseline" else DETAILED_PROMPTS
+            opponent_context = sum(opponents)
+            if options.context_mode == "digest":
+                num_digested = max(0, len(opponents) - options.keep_recent)
+                for i in range(num_digested):
+                    # the digest cache means each speech is digested once per debate
+                    if (opponent_team, i) not in digested:
+                        digested.add((opponent_team, i))
+                        add(position, "digest", model, estimate_tokens(SPEECH_DIGEST_PROMPT) + opponents[i],
+                            stage_output["digest"])
+                opponent_context = num_digested * stage_output["digest"] + sum(opponents[num_digested:])
+            speech_out = speech_tokens.get(arch, stage_output["speech"])
+            add(position, "speech", model,
+                estimate_tokens(prompts[position]) + motion_tokens + teammate + opponent_context, speech_out)
         else:
-            if opp_speeches:
-                teammate_speech = opp_speeches[-1]
-            opponent_speeches = prop_speeches
-            
-        print(f"  {team} Speaker {speaker_num} generating speech...")
-        speech = speaker.generate_speech(motion, teammate_speech, opponent_speeches)
+            refute_out = 0
+            fused = options.rebuttal_mode == "fused"
+            if speaker_num in [2, 3] and fused:
+                add(position, "rebut", model, estimate_tokens(FUSED_REBUTTAL_PROMPT) + sum(opponents), stage_output["rebut"])
+                refute_out = stage_output["rebut"]
+            elif speaker_num in [2, 3] and options.extraction_mode == "incremental":
+                for i, speech in enumerate(opponents):
+                    # each opponent speech is extracted once per debate (and extraction model)
+                    if (opponent_team, i, model) not in extracted:
+                        extracted.add((opponent_team, i, model))
+                        add(position, "extract", model, estimate_tokens(SPEECH_EXTRACT_PROMPT) + speech,
+                            stage_output["extract"])
+                add(position, "bucket", model, estimate_tokens(BUCKET_PROMPT) + len(opponents) * stage_output["extract"],
+                    stage_output["bucket"])
+                threats_out = stage_output["bucket"]
+            elif speaker_num in [2, 3]:
+                add(position, "extract", model, estimate_tokens(EXTRACT_PROMPT) + sum(opponents), stage_output["extract"])
+                threats_out = stage_output["extract"]
+            if speaker_num in [2, 3] and not fused:
+                refute_out = stage_output["refute"]
+                # per bucket: the same work split over 2-3 calls that each re-send the prompt
+                num_calls = (2 if speaker_num == 2 else 3) if options.refute_mode == "per_bucket" else 1
+                for _ in range(num_calls):
+                    add(position, "refute", model, estimate_tokens(REFUTE_PROMPT) + threats_out // num_calls,
+                        refute_out // num_calls)
+            case_out = 0
+            if speaker_num in [1, 2]:
+                if arch == "schema_guided" and speaker_num == 2 and options.speculative:
+                    # shares the first speaker's case node (see DebateGraph)
+                    case_out = num_schemas * stage_output["slot_fill"]
+                elif arch == "schema_guided" and not options.speculative and model in case_filled:
+                    # one speaker at a time: the same parse and slot-fill prompts come back from the artifact store
+                    case_out = num_schemas * stage_output["slot_fill"]
+                elif arch == "schema_guided":
+                    case_filled.add(model)
+                    add(position, "parse", model, estimate_tokens(PARSER_PROMPT) + motion_tokens, stage_output["parse"])
+                    if options.slot_fill_mode == "batched":
+                        add(position, "slot_fill", model,
+                            estimate_tokens(BATCH_SLOT_FILLER_PROMPT) + motion_tokens + num_schemas * 80,
+                            num_schemas * stage_output["slot_fill"])
+                    else:
+                        for _ in range(num_schemas):
+                            add(position, "slot_fill", model, estimate_tokens(SLOT_FILLER_PROMPT) + motion_tokens + 80,
+                                stage_output["slot_fill"])
+                    case_out = num_schemas * stage_output["slot_fill"]
+                elif options.fragment_pool and speaker_num == 2:
+                    # the extension comes from the first speaker's unused fragments
+                    case_out = stage_output["cluster"]
+                    add(position, "cluster", model, estimate_tokens(CLUSTER_PROMPT) + motion_tokens + stage_output["generate"] // 2,
+                        case_out)
+                elif options.generation_mode == "split" or options.fragment_pool:
+                    # the teammate's speech is filtered locally instead of being sent
+                    add(position, "generate", model, estimate_tokens(FRAGMENT_PROMPT) + motion_tokens, stage_output["generate"])
+                    case_out = stage_output["cluster"]
+                    survivors = stage_output["generate"] // 2 if speaker_num == 2 else stage_output["generate"]
+                    add(position, "cluster", model, estimate_tokens(CLUSTER_PROMPT) + motion_tokens + survivors, case_out)
+                else:
+                    case_out = stage_output["generate"]
+                    add(position, "generate", model, estimate_tokens(ARG_GEN_PROMPT) + motion_tokens + teammate, case_out)
+            speech_out = speech_tokens.get(arch, stage_output["synthesize"])
+            if options.synthesis_mode == "sections":
+                # introduction, one rebuttal section per bucket, constructive, conclusion (see section_plan)
+                num_sections = 2 + {2: 2, 3: 3}.get(speaker_num, 0) + (1 if speaker_num in [1, 2] else 0)
+                ingredients = refute_out + case_out
+                add(position, "outline", model, estimate_tokens(OUTLINE_PROMPT) + motion_tokens + ingredients,
+                    stage_output["outline"])
+                for _ in range(num_sections):
+                    add(position, "section", model,
+                        estimate_tokens(SECTION_PROMPT) + motion_tokens + stage_output["outline"] + ingredients // num_sections,
+                        speech_out // num_sections)
+            else:
+                add(position, "synthesize", model, estimate_tokens(SYNTH_PROMPT) + motion_tokens + refute_out + case_out, speech_out)
         
-        if team == "Proposition":
-            prop_speeches.append(speech)
+        spoken[team].append(speech_out)
+        if options.judge_mode == "incremental":
+            add(f"judge_{position}", "judge_speech", MODEL_MAP.get(job["judge_model"], job["judge_model"]),
+                estimate_tokens(SPEECH_JUDGE_PROMPT) + motion_tokens + stage_output["judge_speech"] + speech_out,
+                stage_output["judge_speech"])
+    
+    transcript_tokens = motion_tokens + sum(spoken["Proposition"]) + sum(spoken["Opposition"])
+    if options.judge_mode == "incremental":
+        add("judge", "judge", MODEL_MAP.get(job["judge_model"], job["judge_model"]),
+            estimate_tokens(AGGREGATE_JUDGE_PROMPT) + motion_tokens + stage_output["judge_speech"] * 2, stage_output["judge"])
+        return calls
+    if options.judge_cascade:
+        add("judge_cheap", "judge", MODEL_MAP.get(options.judge_cascade, options.judge_cascade),
+            estimate_tokens(JUDGE_PROMPT) + transcript_tokens, stage_output["judge"])
+    # a panel (and a cascade's strong judge) is planned as if always called; stopping early only ever saves calls
+    for seat, judge in enumerate(options.judge_panel or [job["judge_model"]]):
+        add(f"judge_{seat + 1}" if options.judge_panel else "judge", "judge", MODEL_MAP.get(judge, judge),
+            estimate_tokens(JUDGE_PROMPT) + transcript_tokens, stage_output["judge"])
+    return calls
+
+class PlannedLM:
+    # stands in for dspy.LM when a DebateGraph is only built to read its critical path; never called
+    def __init__(self, name):
+        self.model = MODEL_MAP.get(name, name)
+
+# planned calls that run inside a node of another stage (parse and slot fills share the case node,
+# digests run inside the speech node)
+PLAN_NODE_STAGE = {"parse": "slot_fill", "digest": "speech"}
+
+def plan_critical_path(job, calls):
+    # seconds from the first call to the verdict on the stage scheduler: the same DebateGraph the run builds,
+    # each node timed by the planned calls of its position and stage, and its longest path to the judge
+    options = options_from_job(job)
+    graph = DebateGraph(0, job["motion"], job["prop_arch"], job["opp_arch"], job["prop_model"], job["opp_model"],
+                        job["judge_model"], PlannedLM(job["prop_model"]), PlannedLM(job["opp_model"]),
+                        PlannedLM(job["judge_model"]), num_turns=job["turns"], options=options,
+                        stage_lms={stage: PlannedLM(model) for stage, model in options.stage_models.items()},
+                        judge_lms=[(MODEL_MAP.get(m, m), PlannedLM(m)) for m in options.judge_panel],
+                        cascade_lm=PlannedLM(options.judge_cascade) if options.judge_cascade else None)
+    seconds = {}
+    judge_seconds = []
+    for call in calls:
+        if call["stage"] == "judge" and call["position"] != "judge_cheap":
+            # panel seats (or the single judge) run at once
+            judge_seconds.append(call["latency"])
+        elif call["stage"] == "judge":
+            # the cascade's cheap judge runs before the strong one
+            seconds[("judge", "judge")] = seconds.get(("judge", "judge"), 0.0) + call["latency"]
+        elif call["stage"] == "judge_speech":
+            # logged as judge_<position>; the node sits under the speech's position
+            key = (call["position"][len("judge_"):], "judge_speech")
+            seconds[key] = seconds.get(key, 0.0) + call["latency"]
         else:
-            opp_speeches.append(speech)
-            
-        turns.append(Turn(position, team, speaker_num, speech, arch))
-        print(f"  {team} Speaker {speaker_num} spoke.")
-    
-    print("\n  Judging debate...")
-    prop_scores, opp_scores, winner, rfd = judge_debate(motion, turns, judge_lm)
-    print(f"  Winner: {winner}\n")
-    
-    return DebateResult(
-        motion=motion,
-        prop_model=prop_model_name,
-        opp_model=opp_model_name,
-        judge_model=judge_model_name,
-        prop_architecture=prop_architecture,
-        opp_architecture=opp_architecture,
-        turns=turns,
-        prop_scores=prop_scores,
-        opp_scores=opp_scores,
-        winner=winner,
-        reason_for_decision=rfd
-    )
+            key = (call["position"], PLAN_NODE_STAGE.get(call["stage"], call["stage"]))
+            seconds[key] = seconds.get(key, 0.0) + call["latency"]
+    seconds[("judge", "judge")] = seconds.get(("judge", "judge"), 0.0) + max(judge_seconds, default=0.0)
+
+    nodes = {}
+    for node in graph.nodes:
+        _, position, stage = node.name.split(":")
+        nodes.setdefault((position, stage), []).append(node)
+    for key, group in nodes.items():
+        # a stage split over several nodes (refute buckets, sections, per-speech extracts) splits its calls evenly
+        for node in group:
+            node.est_seconds = seconds.get(key, 0.0) / len(group)
+    graph._compute_critical_paths()
+    return max((node.critical_path for node in graph.nodes), default=0.0)
+
+def plan_study(jobs, concurrency, history=None, share_prefixes=False, prefix_samples=1):
+    plans = [plan_debate(job, history) for job in jobs]
+    if share_prefixes:
+        # drop the calls of speeches an earlier debate in the study already produces
+        seen = set()
+        shared = 0
+        for job, calls, variant in zip(jobs, plans, assign_prefix_variants(jobs, prefix_samples)):
+            order = [p for p, _, _ in FULL_SPEAKING_ORDER[:job["turns"] * 2]]
+            reused = set()
+            for position, key in zip(order, speech_prefix_keys(job, variant)):
+                if key in seen:
+                    reused.add(position)
+                seen.add(key)
+            shared += len(reused)
+            # judge calls still run once per debate, shared speech or not
+            calls[:] = [c for c in calls if c["position"] not in reused or c["stage"].startswith("judge")]
+        print(f"Prefix sharing: {shared} speeches reused across debates")
+    num_schemas, exact = _schemas_per_speaker()
+    # independent stages overlap on the scheduler, so a debate takes its critical path, not the sum of its calls
+    wall = [plan_critical_path(job, calls) for job, calls in zip(jobs, plans)]
+    
+    print(f"\n=== Plan: {len(jobs)} debate(s), concurrency {concurrency} (no models called) ===")
+    if len(jobs) == 1:
+        print(f"\n{'position':<13}{'stage':<14}{'model':<14}{'in tok':>9}{'out tok':>9}{'cost $':>9}{'sec':>7}")
+        for call in plans[0]:
+            print(f"{call['position']:<13}{call['stage']:<14}{call['model']:<14}{call['input_tokens']:>9,}"
+                  f"{call['output_tokens']:>9,}{call['cost']:>9.4f}{call['latency']:>7.1f}")
+    
+    # group identical configurations so a big matrix stays readable
+    groups = {}
+    for job, calls, seconds in zip(jobs, plans, wall):
+        key = (job["prop_arch"], job["prop_model"], job["opp_arch"], job["opp_model"], job["judge_model"], job["turns"])
+        groups.setdefault(key, []).append((calls, seconds))
+    print(f"\nPer debate:")
+    for (pa, pm, oa, om, jm, turns), group in groups.items():
+        calls, seconds = group[0]
+        print(f"  {pa} ({pm}) vs {oa} ({om}), judge {jm}, {turns} turns x{len(group)}: "
+              f"{len(calls)} calls, {sum(c['input_tokens'] for c in calls):,} in / "
+              f"{sum(c['output_tokens'] for c in calls):,} out tokens, "
+              f"${sum(c['cost'] for c in calls):.3f}, ~{seconds / 60:.1f} min "
+              f"({sum(c['latency'] for c in calls) / 60:.1f} min of calls)")
+    
+    print(f"\nPer stage (whole study):")
+    stage_totals = {}
+    for calls in plans:
+        for call in calls:
+            totals = stage_totals.setdefault(call["stage"], [0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += call["input_tokens"]
+            totals[2] += call["output_tokens"]
+            totals[3] += call["cost"]
+    for stage, (count, in_tok, out_tok, cost) in stage_totals.items():
+        print(f"  {stage:<12}{count:>6} calls {in_tok:>12,} in {out_tok:>11,} out  ${cost:.2f}")
+    
+    # each debate takes its critical path, debates run in parallel across slots; greedy fill of the slots
+    slots = [0.0] * max(1, concurrency)
+    for seconds in sorted(wall, reverse=True):
+        slots[slots.index(min(slots))] += seconds
+    all_calls = [c for calls in plans for c in calls]
+    print(f"\nStudy total: {len(all_calls):,} calls, "
+          f"{sum(c['input_tokens'] for c in all_calls):,} input tokens, "
+          f"{sum(c['output_tokens'] for c in all_calls):,} output tokens")
+    print(f"Projected cost: ${sum(c['cost'] for c in all_calls):.2f}")
+    print(f"Projected wall time: ~{max(slots) / 60:.1f} min at concurrency {concurrency}")
+    if not exact:
+        print(f"Note: schema_guided slot fills counted at the largest domain ({num_schemas} schemas)")
+    return plans
+
+def summarize_results(paths, by):
+    # a/b view over result csvs: win rate of each architecture, split by one setting column
+    df = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    if by not in df.columns:
+        df[by] = "(not recorded)"
+    df[by] = df[by].fillna("(not recorded)")
+    # an invalid verdict decided nothing, so it counts for neither side
+    invalid = df["winner"] == "Invalid"
+    if invalid.any():
+        print(f"Skipping {int(invalid.sum())} debates with an Invalid verdict (re-judge or --reparse them)")
+        df = df[~invalid]
+    
+    records = []
+    for _, row in df.iterrows():
+        for side, team in [("prop", "Proposition"), ("opp", "Opposition")]:
+            records.append({by: row[by], "architecture": row[f"{side}_architecture"], "won": row["winner"] == team})
+    sides = pd.DataFrame(records)
+    
+    print(f"\n=== Win rate by {by} ({len(df)} debates) ===")
+    table = sides.groupby([by, "architecture"])["won"].agg(["sum", "count"])
+    for (setting, arch), (wins, count) in table.iterrows():
+        print(f"  {str(setting):<20}{arch:<20}{int(wins):>4}/{int(count):<4} {wins / count:>6.1%}")
+    
+    cost_columns = [c for c in df.columns if c in ["llm_calls", "input_tokens", "output_tokens", "est_cost_usd",
+                                                   "llm_seconds", "wall_seconds"] or c.endswith("_tokens_saved")]
+    if cost_columns:
+        print(f"\n=== Mean per debate by {by} ===")
+        print(df.groupby(by)[cost_columns].mean().round(2).to_string())
+    return table
+
+def reparse_judgement(raw, num_turns=3, panel_size=0):
+    # the row fields result_to_row derives from a verdict, recomputed from the stored judge response(s)
+    if panel_size and raw.lstrip().startswith("["):
+        votes = [dict(zip(["prop_scores", "opp_scores", "winner", "reason"], parse_judge_response(response, num_turns)))
+                 for response in json.loads(raw)]
+        prop_scores, opp_scores, winner, reason = aggregate_panel(votes, panel_size)
+    else:
+        prop_scores, opp_scores, winner, reason = parse_judge_response(raw, num_turns)
+    fields = {"winner": winner, "reason_for_decision": reason}
+    fields["prop_total_score"], fields["opp_total_score"] = judge_totals(prop_scores, opp_scores)
+    for i in range(3):
+        fields[f"prop_{i+1}_score"] = prop_scores[i] if i < len(prop_scores) else None
+        fields[f"opp_{i+1}_score"] = opp_scores[i] if i < len(opp_scores) else None
+    return fields
+
+def _same_cell(old, new):
+    # csv round trips turn ints into floats and None into nan
+    if new is None or (isinstance(old, float) and pd.isna(old)):
+        return (new is None or new == "") and (old is None or pd.isna(old))
+    try:
+        return math.isclose(float(old), float(new), abs_tol=1e-6)
+    except (TypeError, ValueError):
+        return str(old) == str(new)
+
+def reparse_results(paths):
+    # re-run the current judge parser over judge_raw_response in result csvs, in place; no model is called
+    for path in paths:
+        df = pd.read_csv(path)
+        if "judge_raw_response" not in df.columns:
+            print(f"{path}: no judge_raw_response column, skipped")
+            continue
+        reparsed = changed = flipped = 0
+        for i, row in df[df["judge_raw_response"].notna()].iterrows():
+            panel = json.loads(row["judge_panel"]) if isinstance(row.get("judge_panel"), str) else []
+            fields = reparse_judgement(row["judge_raw_response"], int(row["num_turns"]), len(panel))
+            old = {k: row.get(k) for k in fields}
+            reparsed += 1
+            if any(not _same_cell(old[k], v) for k, v in fields.items()):
+                changed += 1
+            if old["winner"] != fields["winner"]:
+                flipped += 1
+            for k, v in fields.items():
+                df.loc[i, k] = v
+        tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        print(f"{path}: {reparsed} rows reparsed, {changed} changed, {flipped} winners flipped")
+
+def calibrate_cascade(paths, target_agreement=0.9, min_pairs=20):
+    # threshold sweep over cascade rows: debates that reached the strong judge (escalated or audited) show
+    # how often the cheap verdict agreed with it at each margin
+    df = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    if "judge_cheap_margin" not in df.columns:
+        print("No cascade rows (run with --judge-cascade)")
+        return None
+    df = df[df["judge_cheap_margin"].notna()]
+    pairs = df[df["judge_strong_winner"].notna()]
+    print(f"\n=== Judge cascade ({len(df)} debates, {len(pairs)} with both verdicts, "
+          f"{int(df['judge_audited'].fillna(False).astype(bool).sum())} audited) ===")
+    print(f"  {'margin >':<10}{'escalated':>10}{'agree above':>14}{'est. agreement':>16}")
+    rows = []
+    for threshold in sorted(set(df["judge_cheap_margin"]) | {0.0}):
+        escalated = (df["judge_cheap_margin"] <= threshold).mean()
+        above = pairs[pairs["judge_cheap_margin"] > threshold]
+        agree = (above["judge_cheap_winner"] == above["judge_strong_winner"]).mean() if len(above) else float("nan")
+        # escalated debates carry the strong verdict, so they agree by construction; with nothing checked
+        # above the margin the rest is unknown
+        estimate = 1.0 if escalated == 1 else escalated + (1 - escalated) * agree
+        rows.append({"threshold": threshold, "escalated": escalated, "agree_above": agree, "n_above": len(above),
+                     "est_agreement": estimate})
+        agree_text = f"{agree:.1%}" if len(above) else "-"
+        estimate_text = "-" if math.isnan(estimate) else f"{estimate:.1%}"
+        print(f"  {threshold:<10g}{escalated:>10.1%}{agree_text:>9} ({len(above):>3}){estimate_text:>16}")
+    table = pd.DataFrame(rows)
+    # an agreement rate over a handful of audited pairs is noise; only margins with min_pairs behind them count
+    supported = table[table["n_above"] >= min_pairs]
+    ok = supported[supported["est_agreement"] >= target_agreement]
+    if not len(supported):
+        print(f"\nInsufficient data: no margin has {min_pairs} debates with both verdicts above it "
+              f"(raise --cascade-audit or run more debates)")
+    elif len(ok):
+        best = ok.iloc[0]
+        print(f"\nLowest margin keeping agreement >= {target_agreement:.0%}: --cascade-margin {best['threshold']:g} "
+              f"(escalates {best['escalated']:.1%} of debates)")
+    else:
+        print(f"\nNo margin with >= {min_pairs} pairs above it keeps agreement >= {target_agreement:.0%} on these rows")
+    return table
+
+def load_motions(path):
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+def build_study_jobs(motions, models, matchups, base_job, both_directions=True):
+    # same layout as the Tests scripts: every motion x model x matchup, optionally with sides swapped
+    jobs = []
+    for model in models:
+        for motion in motions:
+            for matchup in matchups:
+                prop_arch, opp_arch = matchup.split(":")
+                pairs = [(prop_arch, opp_arch)]
+                if both_directions and prop_arch != opp_arch:
+                    pairs.append((opp_arch, prop_arch))
+                for pa, oa in pairs:
+                    job = dict(base_job)
+                    job.update({"motion": motion, "prop_model": model, "opp_model": model,
+                                "prop_arch": pa, "opp_arch": oa})
+                    jobs.append(job)
+    return jobs
+
+def run_tournament(jobs, api_key, concurrency=20, study_budget=None, scheduler=None, share_prefixes=True,
+                   prefix_samples=1):
+    # every debate's stages go through one scheduler; concurrency is how many debates are open at once
+    print(f"=== Tournament: {len(jobs)} debates, {concurrency} at a time ===")
+    scheduler = scheduler or StageScheduler()
+    counts = {"ok": 0, "fail": 0, "skip": 0, "shared": 0}
+    prefix_cache = {} if share_prefixes else None
+    variants = assign_prefix_variants(jobs, prefix_samples)
+    
+    def job_name(job):
+        return f"{job['prop_arch']} vs {job['opp_arch']} ({job['prop_model']}): {job['motion'][:50]}"
+    
+    def record(graph):
+        job = graph.job
+        if isinstance(graph.error, BudgetExceeded):
+            print(f"  [SKIP] {job_name(job)}: {graph.error}")
+            counts["skip"] += 1
+        elif graph.error:
+            print(f"  [FAIL] {job_name(job)}: {graph.error!r}")
+            counts["fail"] += 1
+        else:
+            result = graph.result()
+            if job.get("output"):
+                append_rows_to_csv([result_to_row(result, job["turns"])], job["output"])
+            print(f"  [OK] {job_name(job)} -> {result.winner}")
+            counts["ok"] += 1
+    
+    def graphs():
+        for index, job in enumerate(jobs):
+            # the governor runs at admission time, so it sees what earlier debates actually spent
+            try:
+                admit_debate(job, study_budget)
+            except BudgetExceeded as e:
+                print(f"  [SKIP] {job_name(job)}: {e}")
+                counts["skip"] += 1
+                continue
+            graph = DebateGraph(index, **job_debate_kwargs(job, api_key, study_budget), on_finished=record,
+                                prefix_cache=prefix_cache, prefix_keys=speech_prefix_keys(job, variants[index]),
+                                variant=variants[index] if prefix_samples > 1 else None)
+            graph.job = job
+            counts["shared"] += graph.shared_speeches
+            yield graph
+    
+    scheduler.run(graphs(), max_active=concurrency)
+    print(f"Tournament complete: {counts['ok']} succeeded, {counts['fail']} failed, "
+          f"{counts['skip']} skipped for budget")
+    if share_prefixes:
+        print(f"Shared prefixes: {counts['shared']} speeches reused instead of generated")
+    if study_budget:
+        print(f"Study budget: ${study_budget.spent:.2f} of ${study_budget.max_cost_usd:.2f} spent")
 
 def main():
+    global LM_REGISTRY
+    
+    # the registry is read first because its logical model names are valid -pm/-om/-jm choices
+    pre_parser = argparse.ArgumentParser(add_help=False)
+    pre_parser.add_argument('--lm-registry', type=str, default=os.path.join(SCRIPT_DIR, 'lm_registry.json'))
+    registry_path = pre_parser.parse_known_args()[0].lm_registry
+    if registry_path and os.path.exists(registry_path):
+        print(f"Loading LM registry from {registry_path}")
+        LM_REGISTRY = LMRegistry.from_file(registry_path)
+    registry_models = list(LM_REGISTRY.pools) if LM_REGISTRY else []
+    speaker_models = ['4o', '4o-mini', 'o1', 'o1-mini'] + [m for m in registry_models if m not in MODEL_MAP]
+    judge_models = ['o3', 'o1'] + [m for m in registry_models if m not in ['o3', 'o1']]
+    
     parser = argparse.ArgumentParser(
         description='Run crossover debate with configurable models and architectures',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -645,10 +3344,10 @@ Examples:
     parser.add_argument('-t', '--turns', type=int, choices=[1, 2, 3], default=3,
                         help='Number of turns (1, 2, or 3)')
     parser.add_argument('-pm', '--prop-model', type=str, default='4o-mini',
-                        choices=['4o', '4o-mini', 'o1', 'o1-mini'],
+                        choices=speaker_models,
                         help='Model for Proposition')
     parser.add_argument('-om', '--opp-model', type=str, default='4o-mini',
-                        choices=['4o', '4o-mini', 'o1', 'o1-mini'],
+                        choices=speaker_models,
                         help='Model for Opposition')
     parser.add_argument('-pa', '--prop-arch', type=str, default='baseline',
                         choices=['baseline', 'detailed_prompts', 'enhanced', 'schema_guided'],
@@ -657,96 +3356,259 @@ Examples:
                         choices=['baseline', 'detailed_prompts', 'enhanced', 'schema_guided'],
                         help='Architecture for Opposition')
     parser.add_argument('-jm', '--judge-model', type=str, default='o3',
-                        choices=['o3', 'o1'],
+                        choices=judge_models,
                         help='Judge model')
+    parser.add_argument('--judge-mode', type=str, default='transcript', choices=['transcript', 'incremental'],
+                        help='incremental: judge each speech against a running ledger as soon as it exists, then aggregate')
+    parser.add_argument('--judge-format', type=str, default='text', choices=['text', 'json'],
+                        help='Ask the judge for a json verdict instead of score lines (either is parsed)')
+    parser.add_argument('--no-judge-repair', action='store_true',
+                        help='Keep verdicts with missing or out-of-range scores as they are instead of repairing them')
+    parser.add_argument('--reparse', type=str, nargs='+', metavar='CSV',
+                        help='Recompute scores and winners from judge_raw_response in result CSVs, in place, and exit')
+    parser.add_argument('--judge-cascade', type=str, choices=speaker_models + ['o3'], metavar='MODEL',
+                        help='Cheap first judge, e.g. 4o-mini; only close debates go on to -jm (or --judge-panel)')
+    parser.add_argument('--cascade-margin', type=float, default=5.0,
+                        help='With --judge-cascade, the cheap verdict stands when the total scores differ by more than this')
+    parser.add_argument('--cascade-audit', type=float, default=0.0,
+                        help='With --judge-cascade, share of decisive cheap verdicts also sent to the strong judge')
+    parser.add_argument('--calibrate-cascade', type=str, nargs='+', metavar='CSV',
+                        help='Print escalation rate and estimated agreement per --cascade-margin from result CSVs and exit')
+    parser.add_argument('--target-agreement', type=float, default=0.9,
+                        help='With --calibrate-cascade, the agreement with the strong judge to keep')
+    parser.add_argument('--min-pairs', type=int, default=20,
+                        help='With --calibrate-cascade, debates with both verdicts needed above a margin to recommend it')
+    parser.add_argument('--judge-panel', type=str, nargs='+', choices=judge_models, metavar='MODEL',
+                        help='Judge with a concurrent panel instead of -jm, e.g. o3 o1 o3; stops once a majority is decided')
     parser.add_argument('-m', '--motion', type=str, default='This house would make voting mandatory',
                         help='Debate motion')
     parser.add_argument('-o', '--output', type=str, default='crossover_debate_results.csv',
                         help='Output CSV filename')
+    parser.add_argument('--lm-registry', type=str, default=os.path.join(SCRIPT_DIR, 'lm_registry.json'),
+                        help='LM pool config (deployments, selection policy, failover). Used when the file exists')
+    parser.add_argument('--serve', type=str, metavar='SPOOL_DIR',
+                        help='Run as a long-lived worker that takes debate jobs from SPOOL_DIR')
+    parser.add_argument('--workers', type=int, default=4,
+                        help='Number of debates the worker runs at once (with --serve)')
+    parser.add_argument('--submit', type=str, metavar='SPOOL_DIR',
+                        help='Send the debate to a running worker instead of running it here')
+    parser.add_argument('--jobs-file', type=str,
+                        help='JSONL file of debate jobs to submit (with --submit); missing fields use the cli values')
+    parser.add_argument('--no-wait', action='store_true',
+                        help='Return right after submitting instead of waiting for results')
+    parser.add_argument('--tournament', action='store_true',
+                        help='Run every motion x model x matchup instead of a single debate')
+    parser.add_argument('--motions-file', type=str, default=os.path.join(SCRIPT_DIR, 'motions.txt'),
+                        help='Motions for --tournament, one per line')
+    parser.add_argument('--models', type=str, nargs='+', choices=speaker_models,
+                        help='Models for --tournament (both sides use the same model). Default: --prop-model')
+    parser.add_argument('--matchups', type=str, nargs='+',
+                        help='PROP_ARCH:OPP_ARCH pairs for --tournament. Default: --prop-arch:--opp-arch')
+    parser.add_argument('--one-direction', action='store_true',
+                        help='Do not add the side-swapped debate for each matchup')
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help='Debates run at once in --tournament (also used by --plan)')
+    parser.add_argument('--max-in-flight', type=int, default=32,
+                        help='LLM calls running at once across all debates of a --tournament')
+    parser.add_argument('--rate-limit', type=str, nargs='+', metavar='MODEL=RPM',
+                        help='Requests per minute per model, counted per LLM call, e.g. gpt-4o=500 o3=50')
+    parser.add_argument('--no-prefix-sharing', action='store_true',
+                        help='In --tournament, generate every speech even when another debate has identical inputs')
+    parser.add_argument('--prefix-samples', type=int, default=1,
+                        help='Independent variants per shared prefix in --tournament (speeches of every variant are sampled)')
+    parser.add_argument('--plan', action='store_true',
+                        help='Print call, token, cost and time forecast without calling any model')
+    parser.add_argument('--call-log', type=str,
+                        help='JSONL file that gets one record per LLM call (also read by --plan)')
+    parser.add_argument('--debate-budget', type=float,
+                        help='Spending ceiling per debate in USD (estimated from token counts)')
+    parser.add_argument('--study-budget', type=float,
+                        help='Spending ceiling for the whole tournament or worker lifetime in USD')
+    parser.add_argument('--budget-policy', type=str, default='truncate', choices=['truncate', 'compress', 'skip'],
+                        help='What to do with a call that does not fit the context window or budget')
+    parser.add_argument('--context-mode', type=str, default='full', choices=['full', 'digest'],
+                        help='baseline/detailed_prompts: send older opponent speeches as cached digests')
+    parser.add_argument('--keep-recent', type=int, default=1,
+                        help='With --context-mode digest, how many of the latest opponent speeches stay verbatim')
+    parser.add_argument('--digest-cache', type=str,
+                        help='JSON file to persist speech digests between runs')
+    parser.add_argument('--artifact-dir', type=str,
+                        help='Directory that persists every stage output so reruns only call changed stages')
+    parser.add_argument('--synth-prompt-file', type=str, nargs='+',
+                        help='Text file(s) replacing SYNTH_PROMPT; several files run every debate once per file')
+    parser.add_argument('--extraction-mode', type=str, default='full', choices=['full', 'incremental'],
+                        help='enhanced/schema_guided: extract each opponent speech once and bucket the merged ideas')
+    parser.add_argument('--refute-mode', type=str, default='single', choices=['single', 'per_bucket'],
+                        help='enhanced/schema_guided: refute each threat bucket in its own concurrent call')
+    parser.add_argument('--slot-fill-mode', type=str, default='per_schema', choices=['per_schema', 'batched'],
+                        help='schema_guided: fill all schemas in one json call (missing ones fall back to one call each)')
+    parser.add_argument('--rebuttal-mode', type=str, default='separate', choices=['separate', 'fused'],
+                        help='enhanced/schema_guided: extract and refute in one call instead of two')
+    parser.add_argument('--ir-mode', type=str, default='prose', choices=['prose', 'compact'],
+                        help='enhanced/schema_guided: pass threats, refutations and cases between stages as compact json')
+    parser.add_argument('--response-dedup', type=float, default=0.0, metavar='JACCARD',
+                        help='Drop near-duplicate refutation responses before synthesis, e.g. 0.5. 0 = off')
+    parser.add_argument('--benchmark-dedup', action='store_true',
+                        help='Time the dedup filter on the refute/rebut outputs in --artifact-dir and exit')
+    parser.add_argument('--generation-mode', type=str, default='single', choices=['single', 'split'],
+                        help='enhanced: brainstorm json fragments, filter teammate overlap locally, then cluster')
+    parser.add_argument('--mechanism-overlap', type=float, default=0.5,
+                        help='With --generation-mode split, bigram share of a teammate sentence that marks a fragment as used')
+    parser.add_argument('--fragment-pool', action='store_true',
+                        help='enhanced: 2nd speakers extend from their first speaker\'s unused fragments (implies split generation)')
+    parser.add_argument('--synthesis-mode', type=str, default='single', choices=['single', 'sections'],
+                        help='enhanced/schema_guided: outline the speech, then write its sections concurrently')
+    parser.add_argument('--output-caps', action='store_true',
+                        help='Set max_tokens on every speaker call from word targets and the call log (not for o-series models)')
+    parser.add_argument('--cap-margin', type=float, default=1.5,
+                        help='With --output-caps, max_tokens = expected output x this')
+    parser.add_argument('--stage-models', type=str, nargs='+', metavar='STAGE=MODEL',
+                        help=f'Route pipeline stages to other models, e.g. extract=4o-mini synthesize=4o. '
+                             f'Stages: {", ".join(ROUTABLE_STAGES)}')
+    parser.add_argument('--no-speculative', action='store_true',
+                        help='Run every stage at its speaker\'s turn instead of precomputing constructive material')
+    parser.add_argument('--summarize', type=str, nargs='+', metavar='CSV',
+                        help='Print win rates and mean token/cost columns from result CSVs and exit')
+    parser.add_argument('--by', type=str, default='context_mode',
+                        help='Setting column to split --summarize by. Default: context_mode')
+    parser.add_argument('--history', type=str, nargs='*',
+                        default=[os.path.join(SCRIPT_DIR, 'Tests', '*', '*.csv')],
+                        help='Result CSVs (globs) used by --plan for average speech length')
     
     args = parser.parse_args()
     
+    job = {
+        "motion": args.motion,
+        "turns": args.turns,
+        "prop_model": args.prop_model,
+        "opp_model": args.opp_model,
+        "prop_arch": args.prop_arch,
+        "opp_arch": args.opp_arch,
+        "judge_model": args.judge_model,
+        "output": args.output,
+        "call_log": args.call_log,
+        "debate_budget": args.debate_budget,
+        "budget_policy": args.budget_policy,
+        "context_mode": args.context_mode,
+        "keep_recent": args.keep_recent,
+        "stage_models": parse_stage_models(args.stage_models),
+        "speculative": not args.no_speculative,
+        "extraction_mode": args.extraction_mode,
+        "refute_mode": args.refute_mode,
+        "slot_fill_mode": args.slot_fill_mode,
+        "rebuttal_mode": args.rebuttal_mode,
+        "ir_mode": args.ir_mode,
+        "response_dedup": args.response_dedup,
+        "generation_mode": args.generation_mode,
+        "mechanism_overlap": args.mechanism_overlap,
+        "fragment_pool": args.fragment_pool,
+        "synthesis_mode": args.synthesis_mode,
+        "output_budgets": build_output_budgets(load_plan_history([args.call_log] if args.call_log else [])) if args.output_caps else {},
+        "cap_margin": args.cap_margin,
+        "judge_mode": args.judge_mode,
+        "judge_format": args.judge_format,
+        "judge_repair": not args.no_judge_repair,
+        "judge_panel": args.judge_panel or [],
+        "judge_cascade": args.judge_cascade or "",
+        "cascade_margin": args.cascade_margin,
+        "cascade_audit": args.cascade_audit,
+        "synth_prompt_file": args.synth_prompt_file[0] if args.synth_prompt_file else ""
+    }
+    
+    if args.judge_mode == "incremental" and (args.judge_panel or args.judge_cascade):
+        parser.error("--judge-panel and --judge-cascade judge the full transcript, not --judge-mode incremental")
+    
+    if args.summarize:
+        summarize_results(args.summarize, args.by)
+        return
+    
+    if args.reparse:
+        reparse_results(args.reparse)
+        return
+    
+    if args.calibrate_cascade:
+        calibrate_cascade(args.calibrate_cascade, args.target_agreement, args.min_pairs)
+        return
+    
+    if args.benchmark_dedup:
+        if not args.artifact_dir:
+            parser.error("--benchmark-dedup reads refutation maps from --artifact-dir")
+        artifacts = load_artifacts(args.artifact_dir)
+        maps = artifacts[artifacts["stage"].isin(["refute", "rebut"])]["output"].tolist() if len(artifacts) else []
+        if not maps:
+            parser.error(f"no refute/rebut artifacts in {args.artifact_dir}")
+        benchmark_dedup(maps, args.response_dedup or 0.5)
+        return
+    
+    if args.digest_cache:
+        global DIGEST_CACHE
+        DIGEST_CACHE = SpeechDigestCache(args.digest_cache)
+    
+    if args.artifact_dir:
+        global ARTIFACT_STORE
+        ARTIFACT_STORE = ArtifactStore(args.artifact_dir)
+    
+    if args.tournament:
+        jobs = build_study_jobs(load_motions(args.motions_file), args.models or [args.prop_model],
+                                args.matchups or [f"{args.prop_arch}:{args.opp_arch}"], job,
+                                both_directions=not args.one_direction)
+    elif args.jobs_file:
+        jobs = load_jobs_file(args.jobs_file, job)
+    else:
+        jobs = [job]
+    
+    if args.synth_prompt_file and len(args.synth_prompt_file) > 1:
+        # ablation fan-out: same debates, one synthesis prompt each; with a shared artifact store only synthesis differs
+        jobs = [dict(j, synth_prompt_file=path) for j in jobs for path in args.synth_prompt_file]
+    
+    if args.plan:
+        history = load_plan_history([args.call_log] if args.call_log else [], args.history)
+        plan_study(jobs, args.concurrency, history, share_prefixes=args.tournament and not args.no_prefix_sharing,
+                   prefix_samples=args.prefix_samples)
+        return
+    
+    if args.submit:
+        submit_jobs(args.submit, jobs, wait=not args.no_wait)
+        return
+    
     api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    if not api_key and not LM_REGISTRY:
         raise ValueError("OPENAI_API_KEY not found in environment")
     
-    print("=== Initializing models ===")
-    print("Using OpenAI API directly")
+    study_budget = TokenBudget(args.study_budget, "study budget") if args.study_budget else None
+    RATE_LIMITER.limits = {MODEL_MAP.get(m, m): int(rpm) for m, _, rpm in (r.partition("=") for r in args.rate_limit or [])}
     
-    # map short names to full openai model names
-    model_map = {
-        '4o': 'gpt-4o',
-        '4o-mini': 'gpt-4o-mini',
-        'o1': 'o1',
-        'o1-mini': 'o1-mini'
-    }
+    if args.serve:
+        serve_worker(args.serve, api_key, num_workers=args.workers, study_budget=study_budget)
+        return
     
-    prop_model_full = model_map.get(args.prop_model, args.prop_model)
-    opp_model_full = model_map.get(args.opp_model, args.opp_model)
-    judge_model_full = model_map.get(args.judge_model, args.judge_model)
+    if args.tournament or args.jobs_file or len(jobs) > 1:
+        scheduler = StageScheduler(max_in_flight=args.max_in_flight)
+        run_tournament(jobs, api_key, concurrency=args.concurrency, study_budget=study_budget, scheduler=scheduler,
+                       share_prefixes=args.tournament and not args.no_prefix_sharing, prefix_samples=args.prefix_samples)
+        if LM_REGISTRY:
+            LM_REGISTRY.print_status()
+        return
     
-    prop_lm = dspy.LM(f'openai/{prop_model_full}', api_key=api_key)
-    opp_lm = dspy.LM(f'openai/{opp_model_full}', api_key=api_key)
-    judge_lm = dspy.LM(f'openai/{judge_model_full}', api_key=api_key)
+    print("=== Initializing models ===")
+    print("Using OpenAI API directly")
     
     print("\n" + "="*80)
     print(f"MATCHUP: {args.prop_arch.title()} Prop ({args.prop_model}) vs {args.opp_arch.title()} Opp ({args.opp_model})")
     print("="*80)
     
-    result = run_crossover_debate(
-        motion=args.motion,
-        prop_architecture=args.prop_arch,
-        opp_architecture=args.opp_arch,
-        prop_model_name=prop_model_full,
-        opp_model_name=opp_model_full,
-        judge_model_name=judge_model_full,
-        prop_lm=prop_lm,
-        opp_lm=opp_lm,
-        judge_lm=judge_lm,
-        num_turns=args.turns
-    )
+    try:
+        result, row = run_job(job, api_key)
+    except BudgetExceeded as e:
+        print(f"\n[SKIP] debate stopped by its budget, no row written: {e}")
+        return
     
     print(f"\n=== Crossover Debate Complete ===")
     print(f"Winner: {result.winner}")
-    print(f"Proposition Total: {sum(result.prop_scores)}")
-    print(f"Opposition Total: {sum(result.opp_scores)}")
-    
-    # build output dict
-    data = {
-        "motion": [args.motion],
-        "num_turns": [args.turns],
-        "prop_model": [prop_model_full],
-        "opp_model": [opp_model_full],
-        "judge_model": [judge_model_full],
-        "prop_architecture": [result.prop_architecture],
-        "opp_architecture": [result.opp_architecture],
-        "winner": [result.winner],
-        "reason_for_decision": [result.reason_for_decision],
-        "prop_total_score": [sum(result.prop_scores)],
-        "opp_total_score": [sum(result.opp_scores)],
-    }
-    
-    for i in range(3):
-        data[f"prop_{i+1}_score"] = [result.prop_scores[i] if i < len(result.prop_scores) else None]
-        data[f"opp_{i+1}_score"] = [result.opp_scores[i] if i < len(result.opp_scores) else None]
-    
-    for speaker_num in range(1, 4):
-        data[f"prop_{speaker_num}_speech"] = [None]
-        data[f"opp_{speaker_num}_speech"] = [None]
-    
-    for turn in result.turns:
-        team_prefix = "prop" if turn.team.lower() == "proposition" else "opp"
-        key = f"{team_prefix}_{turn.speaker_number}_speech"
-        data[key] = [turn.speech]
-    
-    df = pd.DataFrame(data)
-    
-    # append or create csv
-    if os.path.exists(args.output):
-        existing_df = pd.read_csv(args.output)
-        df = pd.concat([existing_df, df], ignore_index=True)
+    print(f"Proposition Total: {row['prop_total_score']}")
+    print(f"Opposition Total: {row['opp_total_score']}")
     
-    df.to_csv(args.output, index=False)
+    append_rows_to_csv([row], args.output)
     print(f"\nResults saved to {args.output}")
     
     print("\n" + "="*80)
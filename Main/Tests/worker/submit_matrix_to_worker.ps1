@@ -0,0 +1,43 @@
+# Submit a baseline vs X matrix to a running debate worker
+# Same 40-debate layout as the other Tests scripts: 10 motions x 2 models x 2 directions,
+# but every debate goes to one warm worker process instead of a fresh python per debate.
+#
+# Prerequisites:
+#   - A worker running in another terminal:
+#       python Main\Bhavya_All_Four_Architectures.py --serve Main\Tests\worker\spool --workers 20
+#
+# Usage: Run this script from the worker folder
+#   .\submit_matrix_to_worker.ps1 -Arch enhanced
+
+param(
+    [string]$Arch = "enhanced"
+)
+
+$ScriptDir = $PSScriptRoot
+$TestsDir = Split-Path -Parent $ScriptDir
+$MainDir = Split-Path -Parent $TestsDir
+$SpoolDir = "$ScriptDir\spool"
+$JobsFile = "$ScriptDir\jobs_baseline_vs_$Arch.jsonl"
+$ConsolidatedFile = "$ScriptDir\baseline_vs_${Arch}_ALL_RESULTS.csv"
+
+$motions = Get-Content "$MainDir\motions.txt" | Where-Object { $_.Trim() -ne "" }
+$models = @("4o", "4o-mini")
+
+Write-Host "=== Baseline vs $Arch via worker ===" -ForegroundColor Cyan
+
+# Build one JSON job per debate
+$lines = @()
+foreach ($model in $models) {
+    foreach ($motion in $motions) {
+        $lines += (@{ motion = $motion; turns = 3; prop_model = $model; opp_model = $model; prop_arch = $Arch; opp_arch = "baseline"; judge_model = "o3"; output = $ConsolidatedFile } | ConvertTo-Json -Compress)
+        $lines += (@{ motion = $motion; turns = 3; prop_model = $model; opp_model = $model; prop_arch = "baseline"; opp_arch = $Arch; judge_model = "o3"; output = $ConsolidatedFile } | ConvertTo-Json -Compress)
+    }
+}
+$lines | Set-Content $JobsFile
+
+Write-Host "Submitting $($lines.Count) debates..." -ForegroundColor Yellow
+
+# The worker is the only process writing the csv, so no temp files or merge step are needed
+python "$MainDir\Bhavya_All_Four_Architectures.py" --submit $SpoolDir --jobs-file $JobsFile
+
+Write-Host "Results saved to: $ConsolidatedFile" -ForegroundColor Green